@@ -0,0 +1,127 @@
+"""
+Artefatos estáticos do catálogo para o site.
+O JSON minificado é gravado com o hash do conteúdo no nome
+(auctions.<sha256[:12]>.json), junto das variantes .gz e .br na compressão
+máxima, e um ponteiro pequeno de nome fixo (auctions.latest.json) diz qual é a
+versão atual. O CDN pode servir os artefatos com cache "immutable"; só o
+ponteiro precisa de validade curta. Os registros são gravados em ordem
+canônica (source, id), então a ordem de chegada das fontes não muda o hash e
+conteúdo igual ao da versão anterior não gera arquivos novos. A ordenação é
+externa (scraper/extsort): a memória fica no buffer do sorter, e o hash é
+calculado no fechamento, enquanto o arquivo ordenado é gravado.
+
+Os artefatos ficam fora do main (data/site/ está no .gitignore): o workflow
+os publica no branch gh-pages, servido ao site, e restaura esse branch em
+data/site antes do merge, então o ponteiro e as gerações passam de uma
+execução para a outra.
+
+Dependência opcional: Brotli – sem ele, a variante .br não é gerada.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from scraper import codec
+from scraper.extsort import ExternalSorter
+
+try:
+    import brotli
+except ImportError:        # a variante .br é opcional
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+HASH_CHARS = 12            # caracteres do sha256 no nome do arquivo
+KEEP_GENERATIONS = 3       # versões mantidas para clientes com ponteiro antigo em cache
+CHUNK = 1024 ** 2
+
+logger = logging.getLogger("artifacts")
+
+
+def _compress(src: Path) -> dict:
+    """Grava as variantes comprimidas de `src`; devolve {extensão: tamanho}."""
+    sizes = {}
+    with src.open("rb") as fin, src.with_name(src.name + ".gz").open("wb") as raw, \
+            gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as fout:
+        shutil.copyfileobj(fin, fout, CHUNK)      # mtime=0: mesmo conteúdo, mesmos bytes
+    sizes["gz"] = src.with_name(src.name + ".gz").stat().st_size
+    if brotli is not None:
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        with src.open("rb") as fin, src.with_name(src.name + ".br").open("wb") as fout:
+            while chunk := fin.read(CHUNK):
+                fout.write(compressor.process(chunk))
+            fout.write(compressor.finish())
+        sizes["br"] = src.with_name(src.name + ".br").stat().st_size
+    return sizes
+
+
+class ArtifactWriter:
+    """Writer do catálogo (open/write/close) que publica os artefatos com hash."""
+
+    def __init__(self, out_dir: Path, stem: str = "auctions"):
+        self.out_dir = out_dir
+        self.stem = stem
+        self.pointer = out_dir / f"{stem}.latest.json"
+        self._tmp = out_dir / f"{stem}.json.tmp"
+        self._fp = None
+        self._hash = None
+        self._sorter = ExternalSorter()
+        self.count = 0
+
+    def open(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._sorter = ExternalSorter()
+
+    def _emit(self, data: bytes) -> None:
+        self._fp.write(data)
+        self._hash.update(data)
+
+    def write(self, record: dict) -> None:
+        self._sorter.add((record["source"], record["id"]), codec.dumps(record))
+        self.count += 1
+
+    def close(self) -> None:
+        self._hash = hashlib.sha256()      # ordem canônica: a chegada das fontes não muda o hash
+        with self._tmp.open("wb") as self._fp:
+            self._emit(b"[")
+            for n, (_, line) in enumerate(self._sorter):
+                self._emit(("," + line if n else line).encode("utf-8"))
+            self._emit(b"]")
+        digest = self._hash.hexdigest()
+        name = f"{self.stem}.{digest[:HASH_CHARS]}.json"
+        previous = json.loads(self.pointer.read_text()) if self.pointer.exists() else {}
+        if previous.get("sha256") == digest and (self.out_dir / name).exists():
+            self._tmp.unlink()
+            logger.info("Artefatos: conteúdo inalterado (%s)", name)
+            return
+
+        target = self.out_dir / name
+        self._tmp.replace(target)
+        sizes = {"json": target.stat().st_size, **_compress(target)}
+        generations = [name] + [g for g in previous.get("generations", []) if g != name]
+        pointer = {
+            "sha256": digest,
+            "json": name,
+            **{ext: f"{name}.{ext}" for ext in sizes if ext != "json"},
+            "bytes": sizes,
+            "count": self.count,
+            "generated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "generations": generations[:KEEP_GENERATIONS],
+        }
+        tmp_pointer = self.pointer.with_name(self.pointer.name + ".tmp")
+        tmp_pointer.write_text(json.dumps(pointer, indent=2))
+        tmp_pointer.replace(self.pointer)      # ponteiro só depois dos artefatos
+        self._prune(pointer["generations"])
+        logger.info("Artefatos: %s (%s)", name,
+                    ", ".join(f"{ext}={size / 1024:.0f} KiB" for ext, size in sizes.items()))
+
+    def _prune(self, keep: list) -> None:
+        for path in self.out_dir.glob(f"{self.stem}.*.json*"):
+            base = path.name.split(".json")[0] + ".json"
+            if path != self.pointer and not path.name.endswith(".tmp") and base not in keep:
+                path.unlink()
@@ -0,0 +1,92 @@
+"""
+Benchmark dos backends de scraper/codec.py sobre um catálogo sintético.
+Uso: python -m scraper.bench_codec [--lots 100000] [--repeat 3]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import time
+from dataclasses import asdict
+from typing import Callable, List
+
+from scraper import codec
+from scraper.fetch_auctions import Auction, _JsonArrayWriter
+
+CITIES = ("São Paulo", "Belo Horizonte", "Curitiba", "Florianópolis", "Goiânia", "Ribeirão Preto")
+KINDS = ("Casa", "Apartamento", "Terreno", "Galpão", "Sala comercial", "Fazenda")
+
+
+def synthetic_lots(n: int, seed: int = 0) -> List[Auction]:
+    rnd = random.Random(seed)
+    lots = []
+    for i in range(n):
+        city = rnd.choice(CITIES)
+        lots.append(Auction(
+            source=f"TJ{rnd.choice('ABCDEFGH')}{rnd.choice('ABCDEFGH')}",
+            id=str(100000 + i),
+            title=f"{rnd.choice(KINDS)} com {rnd.randint(40, 900)} m² em {city} – matrícula {rnd.randint(1, 99999)}",
+            auction_date=f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T00:00:00+00:00",
+            location=city,
+            price=f"R$ {rnd.randint(50, 5000)}.{rnd.randint(0, 999):03d},00",
+            photo_path=f"photos/{i}.jpg",
+            url=f"https://leiloes.example.com.br/lote/{i}",
+        ))
+    return lots
+
+
+def _best(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _stream(records: List[dict]) -> None:
+    """Mesmo caminho do _JsonArrayWriter, gravando em memória."""
+    writer = _JsonArrayWriter.__new__(_JsonArrayWriter)
+    writer._fp, writer.count = io.StringIO(), 0
+    for record in records:
+        writer.write(record)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dos codecs JSON")
+    parser.add_argument("--lots", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lots = synthetic_lots(args.lots)
+    print(f"{args.lots} lotes sintéticos, melhor de {args.repeat}\n")
+
+    t_asdict = _best(lambda: [asdict(a) for a in lots], args.repeat)
+    t_shallow = _best(lambda: [a.to_json() for a in lots], args.repeat)
+    print(f"{'asdict()':<28} {t_asdict * 1000:8.1f} ms")
+    print(f"{'Auction.to_json()':<28} {t_shallow * 1000:8.1f} ms  ({t_asdict / t_shallow:.1f}x)\n")
+
+    records = [a.to_json() for a in lots]
+    reference = codec.get("json").dumps(records, True)
+    size_mb = len(reference.encode("utf-8")) / 1024 ** 2
+    ndjson_lines = [codec.get("json").dumps(r, False) for r in records]
+
+    print(f"{'backend':<10} {'array indent':>14} {'writer':>16} {'ndjson dumps':>12} {'ndjson loads':>12}")
+    for name in codec.available():
+        c = codec.get(name)
+        assert c.dumps(records, True) == reference, f"{name} gera texto diferente"
+        t_array = _best(lambda: c.dumps(records, True), args.repeat)
+        t_ndjson = _best(lambda: [c.dumps(r, False) for r in records], args.repeat)
+        t_loads = _best(lambda: [c.loads(line) for line in ndjson_lines], args.repeat)
+        codec._active, previous = c, codec._active
+        try:
+            t_stream = _best(lambda: _stream(records), args.repeat)
+        finally:
+            codec._active = previous
+        print(f"{name:<10} {size_mb / t_array:>9.0f} MB/s {args.lots / t_stream:>10.0f} lotes/s "
+              f"{t_ndjson * 1000:>9.0f} ms {t_loads * 1000:>9.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Teste de escala com catálogo sintético servido localmente.
+Um servidor aiohttp gera, de forma determinística, páginas no formato de cada
+família de plug‑in (tabela dos TJs, cards da Zukerman e da Lance Total,
+busca + detalhe da Mega Leilões, RSS das Juntas) e as fotos dos lotes. Para
+cada tamanho de catálogo, um subprocesso aponta os plug‑ins reais para o
+servidor e roda o _gather_all() inteiro (normalização, filtro, geocodificação,
+gravadores, fotos) num DATA_DIR temporário; com --shards, roda os shards e o
+merge (com descarte de duplicados). O relatório traz tempo, lotes/s e pico de
+memória por tamanho, e o expoente de crescimento entre tamanhos vizinhos:
+acima de SUPERLINEAR, alguma etapa não escala linearmente.
+
+Uso: python -m scraper.bench_scale [--scales 1000,10000,100000] [--shards 0] [--photo-rate 0.05]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from scraper.bench_codec import CITIES, KINDS
+
+SCALES = (1_000, 10_000, 100_000)
+PHOTO_RATE = 0.05          # fração dos lotes com foto
+IMAGE_BYTES = 24 * 1024    # tamanho de cada foto sintética
+PAST_RATE = 0.1            # lotes com leilão já passado (o filtro descarta)
+DUP_RATE = 0.01            # lotes repetidos na listagem (o merge dos shards descarta)
+SUPERLINEAR = 1.15         # expoente tempo/tamanho acima do qual o crescimento é sinalizado
+FIXTURE_DAY = date(2030, 1, 1)     # data base das fixtures: páginas gravadas não mudam com o dia
+HOST = "127.0.0.1"
+
+logger = logging.getLogger("bench_scale")
+
+
+# ---------- Catálogo sintético ----------
+def _family(stem: str) -> str | None:
+    """Formato de página de cada plug‑in (None: sem gerador, fica fora do teste)."""
+    if stem.startswith("tj"):
+        return "tabela"
+    if stem.startswith("juce"):
+        return "rss"
+    return {"zukerman": "zukerman", "lance_total": "lance", "mega_leilões": "mega"}.get(stem)
+
+
+def _lots(slug: str, n: int, today: date | None = None, dup_rate: float = DUP_RATE) -> List[dict]:
+    rnd = random.Random(f"{slug}:{n}")
+    today = today or date.today()
+    lots = []
+    for i in range(n):
+        city = rnd.choice(CITIES)
+        days = rnd.randint(1, 365)
+        lots.append({
+            "id": str(100000 + i),
+            "title": f"{rnd.choice(KINDS)} com {rnd.randint(40, 900)} m² em {city} – matrícula {rnd.randint(1, 99999)}",
+            "date": today + timedelta(days=-days if rnd.random() < PAST_RATE else days),
+            "price": "R$ " + f"{rnd.randint(50_000, 5_000_000):,}".replace(",", ".") + ",00",
+            "city": city,
+            "photo": f"/img/{slug}-{i}.jpg" if rnd.random() < _photo_rate else "",
+        })
+    lots += rnd.sample(lots, int(n * dup_rate))
+    return lots
+
+
+def _tabela(root: str, lots: List[dict]) -> str:
+    rows = []
+    for n, lot in enumerate(lots):
+        img = f"<img src='{lot['photo']}'>" if lot["photo"] else ""
+        rows.append(f"<tr class='linha{'Par' if n % 2 else 'Impar'}'><td>{lot['id']}</td>"
+                    f"<td><a href='/lote/{lot['id']}'>{escape(lot['title'])}</a>{img}</td>"
+                    f"<td>{lot['date']:%d/%m/%Y}</td><td>{lot['price']}</td><td>{lot['city']}</td>"
+                    f"<td>Aberto</td></tr>")
+    return ("<html><body><table id='ctl00_cphConteudo_gdvLeiloes'><tr><th>Processo</th></tr>"
+            + "".join(rows) + "</table></body></html>")
+
+
+def _zukerman(root: str, lots: List[dict]) -> str:
+    cards = []
+    for lot in lots:
+        img = f"<img data-src='{root}{lot['photo']}'>" if lot["photo"] else ""
+        cards.append(f"<div class='card'><a class='card_produto' href='/imovel/casa-{lot['id']}'></a>"
+                     f"<h3 class='titulo-cards'>{escape(lot['title'])}</h3>"
+                     f"<span class='data-leilao'>{lot['date']:%d/%m/%Y}</span>"
+                     f"<span class='preco-cards'>{lot['price']}</span>{img}</div>")
+    return "<html><body>" + "".join(cards) + "</body></html>"
+
+
+def _lance(root: str, lots: List[dict]) -> str:
+    cards = []
+    for lot in lots:
+        img = f"<img data-src='{lot['photo']}'>" if lot["photo"] else ""
+        cards.append(f"<div class='card-imovel'><a href='/lote/{lot['id']}'>ver</a>"
+                     f"<h3 class='card-title'>{escape(lot['title'])}</h3>"
+                     f"<span class='leilao-data'>{lot['date']:%d/%m/%Y}</span>"
+                     f"<span class='valor-lance'>{lot['price']}</span>{img}</div>")
+    return "<html><body>" + "".join(cards) + "</body></html>"
+
+
+def _mega(root: str, lots: List[dict]) -> str:
+    links = "".join(f"<a class='productLink' href='/imoveis/{lot['id']}'>{escape(lot['title'])}</a>"
+                    for lot in lots)
+    return f"<html><body>{links}</body></html>"
+
+
+def _mega_detail(root: str, lot: dict) -> str:
+    img = f"<div class='fotorama__active'><img src='{root}{lot['photo']}'></div>" if lot["photo"] else ""
+    return (f"<html><body><h1 class='product-title'>{escape(lot['title'])}</h1>"
+            f"<div class='date'>{lot['date']:%d/%m/%Y} 14:00</div><div class='price'>{lot['price']}</div>"
+            f"{img}</body></html>")
+
+
+def _rss(root: str, lots: List[dict]) -> str:
+    items = []
+    for lot in sorted(lots, key=lambda lot: lot["date"], reverse=True):     # mais novo primeiro
+        published = datetime.combine(lot["date"], dt_time(9), timezone.utc)
+        items.append(f"<item><title>Edital de leilão – {escape(lot['title'])} – {lot['price']}</title>"
+                     f"<link>{root}/aviso/{lot['id']}</link><pubDate>{format_datetime(published)}</pubDate></item>")
+    return ("<?xml version='1.0' encoding='utf-8'?><rss version='2.0'><channel><title>Diário</title>"
+            + "".join(items) + "</channel></rss>")
+
+
+_LISTINGS: Dict[str, Callable[[str, List[dict]], str]] = {
+    "tabela": _tabela, "zukerman": _zukerman, "lance": _lance, "mega": _mega, "rss": _rss,
+}
+_photo_rate = PHOTO_RATE
+_IMAGE = (b"\xff\xd8\xff\xe0" + bytes(range(256)) * (IMAGE_BYTES // 256))[:IMAGE_BYTES - 2] + b"\xff\xd9"
+
+
+class SyntheticSite:
+    """
+    Páginas sintéticas nas URLs reais de um plug‑in, para gravar as fixtures do
+    scraper.conformance sem rede: a primeira URL pedida recebe a listagem da
+    família do plug‑in e /imoveis/<id>, o detalhe da Mega Leilões. Datas a partir
+    de FIXTURE_DAY e sem lotes repetidos (a conformidade rejeita repetição).
+    """
+
+    def __init__(self, module: ModuleType, n: int):
+        stem = module.__name__.rsplit(".", 1)[-1]
+        self.family = _family(stem)
+        if self.family is None:
+            raise ValueError(f"{module.__name__}: sem gerador de páginas sintéticas")
+        self._lots = _lots(stem, n, FIXTURE_DAY, dup_rate=0)
+        self._listing: str | None = None
+
+    def __getitem__(self, url: str) -> bytes:
+        parts = urlsplit(url)
+        root = f"{parts.scheme}://{parts.netloc}"
+        if "/imoveis/" in parts.path:
+            lot_id = parts.path.rsplit("/", 1)[-1]
+            lot = next((lot for lot in self._lots if lot["id"] == lot_id), None)
+            if lot is None:
+                raise KeyError(url)
+            return _mega_detail(root, lot).encode("utf-8")
+        if self._listing not in (None, url):
+            raise KeyError(url)
+        self._listing = url
+        return _LISTINGS[self.family](root, self._lots).encode("utf-8")
+
+
+# ---------- Servidor ----------
+class _Server:
+    """Rotas /<lotes por fonte>/<família>/<fonte>/...; listagens geradas uma vez por tamanho."""
+
+    def __init__(self):
+        self._pages: Dict[tuple, bytes] = {}
+        self._lots: Dict[tuple, Dict[str, dict]] = {}
+        self.port = 0
+
+    def clear(self) -> None:
+        self._pages.clear()
+        self._lots.clear()
+
+    def _catalog(self, slug: str, n: int) -> Dict[str, dict]:
+        if (slug, n) not in self._lots:
+            self._lots[(slug, n)] = {lot["id"]: lot for lot in _lots(slug, n)}
+        return self._lots[(slug, n)]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        n, family, slug = int(request.match_info["n"]), request.match_info["family"], request.match_info["slug"]
+        tail = request.match_info["tail"]
+        root = f"http://{HOST}:{self.port}/{n}/{family}/{slug}"
+        if tail.startswith("img/"):
+            return web.Response(body=_IMAGE, content_type="image/jpeg")
+        if tail.startswith("imoveis/"):
+            lot = self._catalog(slug, n).get(tail.rsplit("/", 1)[-1])
+            if lot is None:
+                raise web.HTTPNotFound()
+            return web.Response(text=_mega_detail(root, lot), content_type="text/html")
+        key = (family, slug, n)
+        if key not in self._pages:
+            lots = _lots(slug, n)              # com as repetições
+            self._pages[key] = _LISTINGS[family](root, lots).encode("utf-8")
+        kind = "application/rss+xml" if family == "rss" else "text/html"
+        return web.Response(body=self._pages[key], content_type=kind, charset="utf-8")
+
+    async def start(self) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_get("/{n}/{family}/{slug}/{tail:.*}", self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, HOST, 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return runner
+
+
+# ---------- Execução de um tamanho (subprocesso) ----------
+def _repoint(module: ModuleType, family: str, root: str) -> None:
+    """Aponta as URLs do plug‑in para o servidor local."""
+    if family == "rss":
+        module.RSS_URL = f"{root}/rss"
+        return
+    module.BASE_URL = root
+    if hasattr(module, "LIST_URL"):
+        module.LIST_URL = f"{root}/list"
+    if hasattr(module, "USE_SITEMAP"):
+        module.USE_SITEMAP = False
+
+
+def _sandbox(fa: ModuleType, data_dir: Path) -> None:
+    """Todas as saídas e caches do fetch_auctions num diretório descartável."""
+    from scraper import feeds
+
+    fa.DATA_DIR = data_dir
+    fa.PHOTOS_DIR = data_dir / "photos"
+    fa.SHARDS_DIR = data_dir / "shards"
+    fa.COSTS_FILE = data_dir / "source_costs.json"
+    fa.SCHEDULE_FILE = data_dir / "source_schedule.json"
+    fa.HEALTH_FILE = data_dir / "source_health.json"
+    fa.SOURCES_DIR = data_dir / "sources"
+    fa.SITE_DIR = data_dir / "site"
+    fa.PROFILE_DIR = data_dir / "profile"
+    fa.CACHE_DIR = data_dir / "cache"
+    fa.PHOTO_QUEUE_FILE = fa.CACHE_DIR / "photo_queue.json"
+    fa.GEO_DIR = data_dir / "geo"
+    fa.HISTORY_FILE = data_dir / "history" / "prices.sqlite"
+    fa.CORE_SCRAPERS = False
+    fa._parse_cache = None               # caches abertos antes do redirecionamento
+    feeds._state = None
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024      # Linux: KiB
+
+
+async def _run_scale(lots: int, port: int, shards: int, verbose: bool) -> dict:
+    from scraper import fetch_auctions as fa, photos     # configura o logging na importação
+
+    if not verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    modules = []
+    for module in fa._discover_sources():
+        family = _family(module.__name__.rsplit(".", 1)[-1])
+        if family is not None:
+            modules.append((module, family))
+    per_source = max(1, lots // len(modules))
+    for module, family in modules:
+        _repoint(module, family, f"http://{HOST}:{port}/{per_source}/{family}/{fa._slug(module.__name__)}")
+    fa._discover_sources = lambda: [module for module, _ in modules]      # só as fontes com gerador
+
+    data_dir = Path(tempfile.mkdtemp(prefix="bench-scale-"))
+    _sandbox(fa, data_dir)
+    timings = {"photos": 0.0}
+    download_all = photos.download_all
+
+    async def _timed_photos(*args):
+        started = time.perf_counter()
+        try:
+            return await download_all(*args)
+        finally:
+            timings["photos"] += time.perf_counter() - started
+
+    photos.download_all = _timed_photos
+    base_rss = _rss_mb()
+    started = time.perf_counter()
+    try:
+        if shards > 1:
+            fetch = 0.0
+            for index in range(shards):
+                await fa._gather_all(shard=(index, shards))
+                fetch = max(fetch, max(fa._run_costs.values(), default=0.0))
+            merge_started = time.perf_counter()
+            written = fa.merge_shards(fa.SHARDS_DIR)
+            timings["merge"] = time.perf_counter() - merge_started
+        else:
+            written = await fa._gather_all()
+            fetch = max(fa._run_costs.values(), default=0.0)
+        seconds = time.perf_counter() - started
+        downloaded = sum(1 for _ in fa.PHOTOS_DIR.iterdir()) if fa.PHOTOS_DIR.exists() else 0
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return {"lots": per_source * len(modules), "sources": len(modules), "written": written,
+            "photos": downloaded, "seconds": seconds, "fetch": fetch, "photos_s": timings["photos"],
+            "merge_s": timings.get("merge"), "rss_mb": _rss_mb(), "base_rss_mb": base_rss}
+
+
+# ---------- Relatório ----------
+def _exponent(small: dict, large: dict, key: Callable[[dict], float]) -> float | None:
+    a, b = key(small), key(large)
+    if a <= 0 or b <= 0 or large["lots"] == small["lots"]:
+        return None
+    return math.log(b / a) / math.log(large["lots"] / small["lots"])
+
+
+def _report(results: List[dict]) -> None:
+    print(f"\n{'lotes':>9} {'gravados':>9} {'fotos':>7} {'tempo':>8} {'coleta':>8} {'fotos':>7} "
+          f"{'lotes/s':>9} {'pico MB':>8} {'Δ MB':>7} {'exp. t':>7} {'exp. mem':>8}")
+    previous = None
+    for r in results:
+        exp_t = exp_m = None
+        if previous is not None:
+            exp_t = _exponent(previous, r, lambda x: x["seconds"])
+            exp_m = _exponent(previous, r, lambda x: x["rss_mb"] - x["base_rss_mb"])
+        print(f"{r['lots']:>9} {r['written']:>9} {r['photos']:>7} {r['seconds']:>7.1f}s {r['fetch']:>7.1f}s "
+              f"{r['photos_s']:>6.1f}s {r['lots'] / r['seconds']:>9.0f} {r['rss_mb']:>8.0f} "
+              f"{r['rss_mb'] - r['base_rss_mb']:>7.0f} {'' if exp_t is None else f'{exp_t:.2f}':>7} "
+              f"{'' if exp_m is None else f'{exp_m:.2f}':>8}")
+        if r["merge_s"] is not None:
+            print(f"{'':>9} merge dos shards: {r['merge_s']:.1f}s")
+        if exp_t is not None and exp_t > SUPERLINEAR:
+            print(f"{'':>9} ⚠ tempo cresce com expoente {exp_t:.2f} entre {previous['lots']} e {r['lots']} lotes")
+        if exp_m is not None and exp_m > SUPERLINEAR:
+            print(f"{'':>9} ⚠ memória cresce com expoente {exp_m:.2f} entre {previous['lots']} e {r['lots']} lotes")
+        previous = r
+
+
+async def _drive(args: argparse.Namespace) -> List[dict]:
+    server = _Server()
+    runner = await server.start()
+    results = []
+    try:
+        for lots in args.scales:
+            server.clear()
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "scraper.bench_scale", "--child", str(lots), "--port", str(server.port),
+                "--shards", str(args.shards), *(["--verbose"] if args.verbose else []),
+                stdout=asyncio.subprocess.PIPE)
+            out, _ = await proc.communicate()
+            if proc.returncode != 0:
+                raise SystemExit(f"Execução com {lots} lotes falhou (código {proc.returncode})")
+            result = json.loads(out.decode().strip().splitlines()[-1])
+            print(f"{lots} lotes: {result['seconds']:.1f}s, {result['written']} gravados", flush=True)
+            results.append(result)
+    finally:
+        await runner.cleanup()
+    return results
+
+
+def main() -> None:
+    global _photo_rate
+    parser = argparse.ArgumentParser(description="Teste de escala com catálogo sintético local")
+    parser.add_argument("--scales", type=lambda s: [int(x) for x in s.split(",")], default=list(SCALES),
+                        help="tamanhos do catálogo, separados por vírgula")
+    parser.add_argument("--shards", type=int, default=0, help="roda N shards + merge em vez da execução única")
+    parser.add_argument("--photo-rate", type=float, default=PHOTO_RATE, help="fração dos lotes com foto")
+    parser.add_argument("--verbose", action="store_true", help="mantém os logs INFO do orquestrador")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    _photo_rate = args.photo_rate
+
+    if args.child is not None:
+        print(json.dumps(asyncio.run(_run_scale(args.child, args.port, args.shards, args.verbose))), flush=True)
+        return
+    _report(asyncio.run(_drive(args)))
+
+
+if __name__ == "__main__":
+    main()
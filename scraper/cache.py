@@ -0,0 +1,88 @@
+"""
+Cache em disco com validade (TTL) opcional por entrada e despejo LRU limitado por tamanho.
+Cada entrada é um arquivo JSON; o mtime marca o último acesso.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from scraper import codec
+
+logger = logging.getLogger("cache")
+
+
+def body_hash(body: str | bytes) -> str:
+    data = body.encode("utf-8") if isinstance(body, str) else body
+    return hashlib.sha256(data).hexdigest()
+
+
+class DiskCache:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size: int | None = None      # calculado na primeira gravação
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, key: str, allow_expired: bool = False) -> Any | None:
+        """Valor da entrada; None se não existir ou se tiver vencido (salvo `allow_expired`)."""
+        path = self._path(key)
+        try:
+            entry = codec.loads(path.read_bytes())
+            value, expires = entry["value"], entry["expires"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        if expires is not None and expires < time.time() and not allow_expired:
+            self.misses += 1
+            return None
+        os.utime(path)                     # marca como usado recentemente
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        old = path.stat().st_size if path.exists() else 0
+        expires = time.time() + ttl if ttl is not None else None
+        data = codec.dumps({"value": value, "expires": expires})
+        path.write_text(data, encoding="utf-8")
+        self._track(len(data.encode("utf-8")) - old)
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        if path.exists():
+            self._track(-path.stat().st_size)
+            path.unlink()
+
+    def _track(self, delta: int) -> None:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+        else:
+            self._size += delta
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove as entradas menos usadas até caber em 90% do limite."""
+        entries = sorted(((p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob("*/*.json")),
+                         key=lambda e: e[0])
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            removed += 1
+        logger.info("Cache %s: %d entradas despejadas (LRU)", self.root.name, removed)
@@ -0,0 +1,98 @@
+"""
+Codec JSON da saída e dos caches.
+Usa orjson ou msgspec quando instalados e cai para o json da biblioteca padrão.
+Os três geram o mesmo texto (UTF‑8 sem escapes; compacto ou com indentação de
+2 espaços), então trocar de backend não muda nenhum arquivo gravado. Floats
+pequenos ou grandes saem no formato do json (1e-07, 1e+16, 1.5e-05), não no
+do orjson/msgspec (1e-7, 1e16, 0.000015).
+
+Dependências opcionais: orjson ou msgspec.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, NamedTuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+PREFERRED = ("orjson", "msgspec", "json")   # ordem de escolha do backend
+CODEC: str | None = None                    # força um backend; None = o primeiro instalado
+
+
+# número que o orjson/msgspec escrevem diferente do json; strings casam inteiras para não tocar no conteúdo
+_FLOAT_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|(?<![\d.])-?(?:\d+(?:\.\d+)?[eE][-+]?\d+|0\.0000\d+)')
+_EXPONENT = re.compile(r"e(?<=\de)[-\d]")   # começa pelo literal "e": a busca fica rápida em textos grandes
+
+
+class Codec(NamedTuple):
+    name: str
+    dumps: Callable[[Any, bool], str]       # (objeto, indentado?) -> texto
+    loads: Callable[[str | bytes], Any]
+
+
+def _json_dumps(obj: Any, indent: bool) -> str:
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_floats(text: str) -> str:
+    """Reescreve os floats no formato do json (repr do Python), fora das strings."""
+    if "0.0000" not in text and not _EXPONENT.search(text):     # caso comum: já é o texto do json
+        return text
+    return _FLOAT_TOKEN.sub(lambda m: m.group() if m.group()[0] == '"' else repr(float(m.group())), text)
+
+
+def _orjson_dumps(obj: Any, indent: bool) -> str:
+    return _json_floats(orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8"))
+
+
+def _msgspec_dumps(obj: Any, indent: bool) -> str:
+    data = msgspec.json.encode(obj)
+    return _json_floats((msgspec.json.format(data, indent=2) if indent else data).decode("utf-8"))
+
+
+def _msgspec_loads(data: str | bytes) -> Any:
+    try:
+        return msgspec.json.decode(data)
+    except msgspec.DecodeError as exc:     # mesma exceção dos outros backends
+        raise ValueError(str(exc)) from None
+
+
+_CODECS: Dict[str, Codec] = {"json": Codec("json", _json_dumps, json.loads)}
+if orjson is not None:
+    _CODECS["orjson"] = Codec("orjson", _orjson_dumps, orjson.loads)
+if msgspec is not None:
+    _CODECS["msgspec"] = Codec("msgspec", _msgspec_dumps, _msgspec_loads)
+
+
+def available() -> List[str]:
+    return [name for name in PREFERRED if name in _CODECS]
+
+
+def get(name: str | None = None) -> Codec:
+    if name is None:
+        return _CODECS[available()[0]]
+    if name not in _CODECS:
+        raise ValueError(f"backend {name!r} indisponível (instalados: {', '.join(available())})")
+    return _CODECS[name]
+
+
+_active = get(CODEC)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    return _active.dumps(obj, indent)
+
+
+def loads(data: str | bytes) -> Any:
+    return _active.loads(data)
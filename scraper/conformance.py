@@ -0,0 +1,349 @@
+"""
+Conformidade dos plug‑ins de scraper/sources/ contra páginas gravadas.
+Cada plug‑in tem em FIXTURES_DIR/<módulo>/ as respostas de uma coleta (uma
+por URL) e um fixture.json com o que se espera dela e a origem das páginas;
+plug‑in sem fixture é falha.
+
+Origem "synthetic": páginas do catálogo sintético do bench_scale nas URLs reais
+do plug‑in (--record --synthetic). O gerador segue os seletores dos próprios
+plug‑ins, então essas fixtures são só de fumaça: pegam quebra de esquema,
+contagem e orçamento quando o código muda, mas não mudança nos sites reais.
+Origem "live": coleta real (--record fonte), a única que detecta deriva do
+site; substitui a sintética do plug‑in quando gravada.
+O harness troca net.get_text/get_bytes/iter_chunks por leituras desses
+arquivos, roda o fetch() de verdade e confere:
+* esquema: toda saída é um Auction válido, sem (source, id) repetido;
+* contagens: linhas emitidas, descartadas (row_failed) e com data/preço que
+  a normalização não reconhece iguais às gravadas;
+* custo: ms e KiB de pico (tracemalloc) por 1.000 linhas dentro do orçamento
+  que o plug‑in declara em PARSE_BUDGET (ou DEFAULT_BUDGET).
+
+Uso:
+  python -m scraper.conformance [fonte ...]                 confere (sai com 1 se algo falhar)
+  python -m scraper.conformance --record fonte              grava as fixtures de uma coleta ao vivo
+  python -m scraper.conformance --record --synthetic [fonte ...]
+                                                            grava a partir do catálogo sintético
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import inspect
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import AsyncIterator, Dict, List, Mapping, Tuple
+
+from scraper import feeds, fetch_auctions as fa, net, normalize, photos
+from scraper.bench_scale import SyntheticSite
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+DEFAULT_BUDGET = {"ms": 2000.0, "kib": 64 * 1024.0}   # por 1.000 linhas, se o plug‑in não declarar PARSE_BUDGET
+REPEAT = 5                 # execuções cronometradas (vale a melhor)
+SYNTHETIC_LOTS = 50        # lotes por plug‑in nas fixtures geradas com --synthetic
+
+logger = logging.getLogger("conformance")
+
+
+class MissingFixture(Exception):
+    """O plug‑in pediu uma URL que não está gravada (a página mudou de endereço ou o parse mudou)."""
+
+
+@dataclass
+class Result:
+    name: str
+    rows: int = 0
+    ms_per_1000: float = 0.0
+    kib_per_1000: float = 0.0
+    failures: List[str] = field(default_factory=list)
+    skipped: bool = False
+    origin: str = ""
+
+
+def _file_for(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".body"
+
+
+class _Fixtures:
+    """Substitui as funções de rede de scraper/net.py enquanto está ativo; `bodies` é url → corpo."""
+
+    def __init__(self, bodies: Mapping[str, bytes]):
+        self._bodies = bodies
+        self._saved = {}
+
+    def _body(self, url: str) -> bytes:
+        try:
+            return self._bodies[url]
+        except KeyError:
+            raise MissingFixture(url) from None
+
+    async def get_text(self, session, url: str, headers: dict = net.HEADERS) -> str:
+        return self._body(url).decode("utf-8")
+
+    async def get_bytes(self, session, url: str, headers: dict = net.HEADERS) -> bytes:
+        return self._body(url)
+
+    async def iter_chunks(self, session, url: str, headers: dict = net.HEADERS,
+                          chunk_size: int = net.STREAM_CHUNK) -> AsyncIterator[bytes]:
+        body = self._body(url)
+        for offset in range(0, len(body), chunk_size):
+            yield body[offset:offset + chunk_size]
+
+    def __enter__(self):
+        for name in ("get_text", "get_bytes", "iter_chunks"):
+            self._saved[name] = getattr(net, name)
+            setattr(net, name, getattr(self, name))
+        return self
+
+    def __exit__(self, *exc):
+        for name, func in self._saved.items():
+            setattr(net, name, func)
+
+
+class _Recorder:
+    """Deixa as funções de rede reais passarem e guarda cada corpo lido."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.pages: Dict[str, str] = {}
+        self._saved = {}
+
+    def _keep(self, url: str, body: bytes) -> None:
+        name = _file_for(url)
+        (self.directory / name).write_bytes(body)
+        self.pages[url] = name
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        get_text, get_bytes, iter_chunks = net.get_text, net.get_bytes, net.iter_chunks
+        self._saved = {"get_text": get_text, "get_bytes": get_bytes, "iter_chunks": iter_chunks}
+
+        async def _text(session, url, headers=net.HEADERS):
+            text = await get_text(session, url, headers)
+            self._keep(url, text.encode("utf-8"))
+            return text
+
+        async def _bytes(session, url, headers=net.HEADERS):
+            body = await get_bytes(session, url, headers)
+            self._keep(url, body)
+            return body
+
+        async def _chunks(session, url, headers=net.HEADERS, chunk_size=net.STREAM_CHUNK):
+            body = await get_bytes(session, url, headers)      # grava o feed inteiro
+            self._keep(url, body)
+            for offset in range(0, len(body), chunk_size):
+                yield body[offset:offset + chunk_size]
+
+        net.get_text, net.get_bytes, net.iter_chunks = _text, _bytes, _chunks
+        return self
+
+    def __exit__(self, *exc):
+        for name, func in self._saved.items():
+            setattr(net, name, func)
+
+
+def _cold_caches(module: ModuleType, scratch: Path) -> None:
+    """Cada execução começa sem cache de parse, de lotes ou de feed (mede o parse de fato)."""
+    shutil.rmtree(scratch / "cache", ignore_errors=True)
+    fa.CACHE_DIR, fa.PARSE_CACHE = scratch / "cache", False    # nunca lê nem suja data/cache
+    fa._parse_cache = None
+    feeds._state = None
+    if hasattr(module, "_lot_cache"):
+        module._lot_cache = None
+
+
+async def _collect(module: ModuleType, scratch: Path) -> List:
+    _cold_caches(module, scratch)
+    photos_dir = scratch / "photos"
+    net.current_source.set(module.__name__)
+    fa._row_errors.pop(module.__name__, None)
+    if inspect.isasyncgenfunction(module.fetch):
+        out = []
+        async for item in module.fetch(photos_dir):
+            out.extend(item if isinstance(item, (list, tuple)) else (item,))
+        return out
+    return list(await module.fetch(photos_dir))
+
+
+def _counts(module: ModuleType, lots: List) -> Dict[str, int]:
+    valid = [lot for lot in lots if fa._invalid(lot) is None]
+    return {
+        "rows": len(lots),
+        "dropped": fa._row_errors.get(module.__name__, 0),
+        "bad_dates": sum(1 for lot in valid if normalize.parse_date(lot.auction_date) is None),
+        "bad_prices": sum(1 for lot in valid if not normalize.parse_price(lot.price)[0]),
+    }
+
+
+def _schema_failures(lots: List) -> List[str]:
+    failures = []
+    keys = set()
+    for position, lot in enumerate(lots):
+        reason = fa._invalid(lot)
+        if reason is not None:
+            failures.append(f"linha {position}: {reason}")
+            continue
+        if (lot.source, lot.id) in keys:
+            failures.append(f"linha {position}: ({lot.source!r}, {lot.id!r}) repetido")
+        keys.add((lot.source, lot.id))
+        if not lot.url.startswith(("http://", "https://")):
+            failures.append(f"linha {position}: url {lot.url!r} não é absoluta")
+    return failures[:10]
+
+
+async def check(module: ModuleType, scratch: Path, repeat: int = REPEAT) -> Result:
+    """Roda o plug‑in contra as suas fixtures; `scratch` é um diretório temporário descartável."""
+    result = Result(module.__name__)
+    directory = FIXTURES_DIR / module.__name__.rsplit(".", 1)[-1]
+    manifest = directory / "fixture.json"
+    if not manifest.exists():
+        result.skipped = True
+        return result
+    spec = json.loads(manifest.read_text(encoding="utf-8"))
+    result.origin = spec.get("origin", "live")
+
+    bodies = {url: (directory / name).read_bytes() for url, name in spec["pages"].items()}
+    with _Fixtures(bodies):
+        try:
+            lots = await _collect(module, scratch)
+        except Exception as exc:
+            result.failures.append(f"fetch() falhou: {type(exc).__name__}: {exc}")
+            return result
+        result.rows = len(lots)
+        result.failures += _schema_failures(lots)
+        for name, got in _counts(module, lots).items():
+            if got != spec["expect"].get(name, 0):
+                result.failures.append(f"{name}: {got} (gravado: {spec['expect'].get(name, 0)})")
+        if not lots:
+            return result
+        best, peak = await _measure(module, scratch, repeat)
+
+    scale = 1000 / len(lots)
+    result.ms_per_1000 = best * 1000 * scale
+    result.kib_per_1000 = peak / 1024 * scale
+    result.failures += _budget_failures(module, result)
+    return result
+
+
+async def _measure(module: ModuleType, scratch: Path, repeat: int) -> Tuple[float, int]:
+    """(melhor tempo em segundos entre `repeat` coletas, pico de memória em bytes de uma coleta)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await _collect(module, scratch)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        await _collect(module, scratch)
+        return best, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _budget_failures(module: ModuleType, result: Result) -> List[str]:
+    budget = {**DEFAULT_BUDGET, **getattr(module, "PARSE_BUDGET", {})}
+    failures = []
+    if result.ms_per_1000 > budget["ms"]:
+        failures.append(f"tempo {result.ms_per_1000:.0f} ms/1.000 linhas > orçamento {budget['ms']:.0f}")
+    if result.kib_per_1000 > budget["kib"]:
+        failures.append(f"memória {result.kib_per_1000:.0f} KiB/1.000 linhas > orçamento {budget['kib']:.0f}")
+    return failures
+
+
+async def record(module: ModuleType, scratch: Path, synthetic: int = 0) -> Dict[str, int]:
+    """
+    Coleta gravando as respostas; o que ela produz vira o esperado. Com
+    `synthetic`, as respostas vêm de um SyntheticSite com esse número de lotes.
+    """
+    directory = FIXTURES_DIR / module.__name__.rsplit(".", 1)[-1]
+    for old in directory.glob("*.body"):
+        old.unlink()
+    with contextlib.ExitStack() as stack:
+        if synthetic:
+            stack.enter_context(_Fixtures(SyntheticSite(module, synthetic)))
+        recorder = stack.enter_context(_Recorder(directory))
+        lots = await _collect(module, scratch)
+    expect = _counts(module, lots)
+    (directory / "fixture.json").write_text(json.dumps(
+        {"origin": "synthetic" if synthetic else "live", "pages": dict(sorted(recorder.pages.items())),
+         "expect": expect}, indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8")
+    return expect
+
+
+def _select(modules: List[ModuleType], wanted: List[str]) -> List[ModuleType]:
+    if not wanted:
+        return modules
+    chosen = [m for m in modules if m.__name__ in wanted or m.__name__.rsplit(".", 1)[-1] in wanted]
+    unknown = set(wanted) - {m.__name__ for m in chosen} - {m.__name__.rsplit(".", 1)[-1] for m in chosen}
+    if unknown:
+        raise SystemExit(f"Fontes desconhecidas: {', '.join(sorted(unknown))}")
+    return chosen
+
+
+async def _main(args: argparse.Namespace) -> int:
+    modules = _select(fa._discover_sources(), args.sources)
+    broken = {} if args.sources else dict(fa._failures)     # plug‑ins que nem importam
+    scratch = Path(tempfile.mkdtemp(prefix="conformance-"))
+    try:
+        if args.record:
+            for module in modules:
+                expect = await record(module, scratch, args.synthetic)
+                logger.info("%s: fixtures gravadas (%s)", module.__name__,
+                            ", ".join(f"{k}={v}" for k, v in expect.items()))
+            return 0
+
+        results = [await check(module, scratch, args.repeat) for module in modules]
+    finally:
+        photos._pending.clear()
+        photos._origins.clear()
+        await net.aclose()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{'fonte':<36} {'origem':<9} {'linhas':>7} {'ms/1k':>8} {'KiB/1k':>9}  resultado")
+    failed = len(broken)
+    for name, error in sorted(broken.items()):
+        print(f"{name:<36} {'-':<9} {'-':>7} {'-':>8} {'-':>9}  FALHA import: {error}")
+    for r in results:
+        if r.skipped:
+            failed += 1
+            print(f"{r.name:<36} {'-':<9} {'-':>7} {'-':>8} {'-':>9}  FALHA: sem fixture")
+            continue
+        print(f"{r.name:<36} {r.origin:<9} {r.rows:>7} {r.ms_per_1000:>8.1f} {r.kib_per_1000:>9.0f}  "
+              f"{'ok' if not r.failures else 'FALHA'}")
+        for failure in r.failures:
+            print(f"{'':<38}- {failure}")
+        failed += bool(r.failures)
+    synthetic = sum(1 for r in results if r.origin == "synthetic")
+    if synthetic:
+        print(f"\n{synthetic} plug‑ins só com fixtures sintéticas (fumaça): não detectam mudança nos sites; "
+              "grave coletas reais com --record <fonte>.")
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Conformidade e orçamento de parse dos plug‑ins")
+    parser.add_argument("sources", nargs="*", help="módulos (tjsp ou scraper.sources.tjsp); padrão: todos")
+    parser.add_argument("--record", action="store_true", help="grava as fixtures a partir de uma coleta ao vivo")
+    parser.add_argument("--synthetic", type=int, nargs="?", const=SYNTHETIC_LOTS, default=0, metavar="N",
+                        help="com --record: grava a partir do catálogo sintético do bench_scale (N lotes por plug‑in)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+    if args.record and not args.sources and not args.synthetic:
+        parser.error("--record ao vivo precisa das fontes a gravar")
+    if args.synthetic and not args.record:
+        parser.error("--synthetic só vale com --record")
+    sys.exit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Adaptador dos scrapers síncronos de scripts/core (BaseScraper) para o orquestrador.
+Cada `Scraper` encontrado nos pacotes br/us/eu vira uma fonte assíncrona: roda
+num pool de threads limitado, com Sessions reaproveitadas por thread, e seus
+registros entram no mesmo fluxo de Auction dos plug‑ins.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import pkgutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List
+
+from scraper.fetch_auctions import Auction
+
+CORE_PACKAGES = ("scripts.core.br", "scripts.core.us", "scripts.core.eu")
+THREAD_WORKERS = 4         # scrapers síncronos rodando ao mesmo tempo
+
+logger = logging.getLogger("core_scrapers")
+
+_executor: ThreadPoolExecutor | None = None
+_local = threading.local()
+
+
+def _thread_session():
+    """Uma Session (com pool e timeout) por thread do pool, reaproveitada entre scrapers."""
+    from scripts.core.base_scraper import make_session
+
+    if not hasattr(_local, "session"):
+        _local.session = make_session()
+    return _local.session
+
+
+def _to_auction(record, default_source: str) -> Auction | None:
+    if isinstance(record, Auction):
+        return record
+    if not isinstance(record, dict):
+        return None
+    return Auction(
+        source=str(record.get("source") or default_source),
+        id=str(record.get("id") or record.get("url") or ""),
+        title=str(record.get("title", "")),
+        auction_date=str(record.get("auction_date", "")),
+        location=str(record.get("location", "")),
+        price=str(record.get("price", "N/A")),
+        photo_path=str(record.get("photo_path", "")),
+        url=str(record.get("url", "")),
+    )
+
+
+class CoreSource:
+    """Fonte no formato de plug‑in (gerador assíncrono) que embrulha um BaseScraper."""
+
+    def __init__(self, scraper_cls: type):
+        self.scraper_cls = scraper_cls
+        self.__name__ = f"{scraper_cls.__module__}.{scraper_cls.__name__}"
+
+    def _run(self):
+        scraper = self.scraper_cls()
+        own = getattr(scraper, "session", None)
+        if own is not None:
+            own.close()            # a Session criada pelo BaseScraper.__init__ não será usada
+        scraper.session = _thread_session()
+        return scraper.name, scraper.run()
+
+    async def fetch(self, photos_dir) -> AsyncIterator[Auction]:
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="core")
+        loop = asyncio.get_running_loop()
+        name, data = await loop.run_in_executor(_executor, self._run)
+
+        records = data if isinstance(data, list) else [data]
+        skipped = 0
+        for record in records:
+            lot = _to_auction(record, name)
+            if lot is None:
+                skipped += 1
+                continue
+            yield lot
+        if skipped:
+            logger.warning("%s: %d registros ignorados (formato desconhecido)", self.__name__, skipped)
+
+
+def discover() -> List[CoreSource]:
+    """Procura classes `Scraper` (convenção do scripts/core/cli.py) nos pacotes br/us/eu."""
+    from scripts.core.base_scraper import BaseScraper
+
+    sources: List[CoreSource] = []
+    for pkg_name in CORE_PACKAGES:
+        try:
+            pkg = importlib.import_module(pkg_name)
+        except ImportError:
+            continue
+        for info in pkgutil.walk_packages(pkg.__path__, prefix=f"{pkg_name}."):
+            try:
+                module = importlib.import_module(info.name)
+            except Exception as exc:
+                logger.warning("Ignorando %s: %s", info.name, exc)
+                continue
+            cls = getattr(module, "Scraper", None)
+            if isinstance(cls, type) and issubclass(cls, BaseScraper):
+                sources.append(CoreSource(cls))
+    logger.info("%d scrapers de scripts/core encontrados", len(sources))
+    return sources
+
+
+def shutdown() -> None:
+    """Libera o pool sem esperar scrapers que estouraram o prazo global."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,207 @@
+"""
+Modo daemon: um processo de longa duração no lugar da execução fria diária.
+O laço de eventos, a sessão HTTP, o pool dos scrapers síncronos e os caches em
+memória (normalização, geocodificação, parse) ficam quentes entre execuções.
+A cada TICK as fontes vencidas na agenda adaptativa rodam; um plug‑in cujo
+arquivo mudou é recarregado antes da execução seguinte, sem reiniciar.
+
+Controle local (HTTP em CONTROL_HOST:CONTROL_PORT):
+    GET  /status                  estado, última execução e agenda de cada fonte
+    POST /trigger/<fonte>         roda a fonte na próxima execução, vencida ou não
+    POST /pause[/<fonte>]         pausa tudo ou só uma fonte (os lotes dela são mantidos)
+    POST /resume[/<fonte>]
+
+Uso: python -m scraper.daemon
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import signal
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Set
+
+from aiohttp import web
+
+from scraper import core_scrapers, net, scheduler
+from scraper import fetch_auctions as fa
+
+CONTROL_HOST = "127.0.0.1"     # só local: o endpoint não tem autenticação
+CONTROL_PORT = 8787
+TICK = 5 * 60                  # segundos entre verificações da agenda
+
+logger = logging.getLogger("daemon")
+
+
+class Daemon:
+    def __init__(self):
+        self.paused = False
+        self.paused_sources: Set[str] = set()
+        self.forced: Set[str] = set()
+        self.running = False
+        self.last: Dict[str, object] = {}
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._mtimes: Dict[str, float] = {}
+
+    # ---------- Fontes ----------
+    def _sources(self) -> List:
+        modules = fa._discover_sources()
+        if fa.CORE_SCRAPERS:
+            modules += core_scrapers.discover()
+        return modules
+
+    def _resolve(self, name: str) -> str | None:
+        """Aceita o módulo completo ('scraper.sources.tjsp'), o nome curto ('tjsp') ou o rótulo ('TJSP')."""
+        state = scheduler.load_state(fa.SCHEDULE_FILE)
+        for module in self._sources():
+            full = module.__name__
+            if name in (full, full.rsplit(".", 1)[-1]) or name in state.get(full, {}).get("labels", ()):
+                return full
+        return None
+
+    def _reload_changed(self) -> None:
+        """Recarrega plug‑ins cujo arquivo mudou; um plug‑in com erro mantém a versão anterior."""
+        for file in (Path(fa.__file__).parent / "sources").glob("*.py"):
+            name = f"{fa.SOURCES_PACKAGE}.{file.stem}"
+            mtime = file.stat().st_mtime
+            previous = self._mtimes.setdefault(name, mtime)
+            if mtime == previous or name not in sys.modules:
+                continue
+            self._mtimes[name] = mtime
+            try:
+                importlib.reload(sys.modules[name])
+                logger.info("Plug‑in recarregado: %s", name)
+            except Exception as exc:
+                logger.error("Falha ao recarregar %s (mantida a versão anterior): %s", name, exc)
+
+    def _due(self) -> Set[str]:
+        names = [m.__name__ for m in self._sources()]
+        state = scheduler.load_state(fa.SCHEDULE_FILE)
+        return (scheduler.due(state, names, datetime.utcnow()) | self.forced) - self.paused_sources
+
+    # ---------- Execução ----------
+    async def run_once(self) -> None:
+        self._reload_changed()
+        if not self._due():
+            logger.debug("Nenhuma fonte vencida")
+            return
+        forced, self.forced = self.forced, set()
+        self.running = True
+        started = time.monotonic()
+        self.last = {"started": datetime.utcnow().isoformat(), "forced": sorted(forced)}
+        try:
+            count = await fa._gather_all(scheduled=True, force=forced, skip=self.paused_sources, keep_open=True)
+            self.last.update(records=count, error=None)
+        except Exception as exc:
+            logger.exception("Execução falhou: %s", exc)
+            self.forced |= forced          # o pedido vale para a próxima
+            self.last.update(error=repr(exc))
+        finally:
+            self.running = False
+            self.last["seconds"] = round(time.monotonic() - started, 1)
+
+    async def loop(self) -> None:
+        while not self._stop.is_set():
+            if not self.paused:
+                await self.run_once()
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), TICK)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    # ---------- Controle ----------
+    async def _status(self, request: web.Request) -> web.Response:
+        names = [m.__name__ for m in self._sources()]
+        state = scheduler.load_state(fa.SCHEDULE_FILE)
+        known = {n: state[n] for n in names if n in state}      # mesmo recorte de scheduler.due
+        every = scheduler.intervals(known) if known else {}
+        sources = {}
+        for name in names:
+            entry = known.get(name)
+            sources[name] = {
+                "paused": name in self.paused_sources,
+                "forced": name in self.forced,
+                "last_run": entry and entry["last_run"],
+                "interval_h": round(every[name], 2) if name in every else None,
+                "next_run": entry and (datetime.fromisoformat(entry["last_run"])
+                                       + timedelta(hours=every[name])).isoformat(),
+            }
+        return web.json_response({"paused": self.paused, "running": self.running,
+                                  "last": self.last, "sources": sources})
+
+    async def _trigger(self, request: web.Request) -> web.Response:
+        name = self._resolve(request.match_info["source"])
+        if name is None:
+            raise web.HTTPNotFound(text="fonte desconhecida")
+        self.forced.add(name)
+        self._wake.set()
+        return web.json_response({"queued": name})
+
+    async def _pause(self, request: web.Request) -> web.Response:
+        return self._set_paused(request, True)
+
+    async def _resume(self, request: web.Request) -> web.Response:
+        return self._set_paused(request, False)
+
+    def _set_paused(self, request: web.Request, paused: bool) -> web.Response:
+        source = request.match_info.get("source")
+        if source is None:
+            self.paused = paused
+            if not paused:
+                self._wake.set()
+            return web.json_response({"paused": self.paused})
+        name = self._resolve(source)
+        if name is None:
+            raise web.HTTPNotFound(text="fonte desconhecida")
+        if paused:
+            self.paused_sources.add(name)
+        else:
+            self.paused_sources.discard(name)
+        return web.json_response({"paused_sources": sorted(self.paused_sources)})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/status", self._status)
+        app.router.add_post("/trigger/{source}", self._trigger)
+        app.router.add_post("/pause", self._pause)
+        app.router.add_post("/pause/{source}", self._pause)
+        app.router.add_post("/resume", self._resume)
+        app.router.add_post("/resume/{source}", self._resume)
+        return app
+
+
+async def serve(host: str = CONTROL_HOST, port: int = CONTROL_PORT) -> None:
+    daemon = Daemon()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, daemon.stop)
+
+    runner = web.AppRunner(daemon.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("Daemon ouvindo em http://%s:%d (agenda a cada %ds)", host, port, TICK)
+    try:
+        await daemon.loop()
+    finally:
+        await runner.cleanup()
+        await net.aclose()
+        core_scrapers.shutdown()
+        logger.info("Daemon encerrado")
+
+
+def main() -> None:
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
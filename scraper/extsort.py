@@ -0,0 +1,66 @@
+"""
+Ordenação externa das linhas do catálogo para os gravadores canônicos.
+As linhas ficam num buffer de até BUFFER_LINES; cheio, ele é ordenado e
+despejado num arquivo temporário (uma "run"). No fim, as runs são intercaladas
+com heapq.merge, então a memória fica limitada ao buffer e não ao catálogo.
+Catálogo que cabe no buffer nem toca o disco.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+BUFFER_LINES = 50_000      # linhas em memória antes de despejar uma run em disco
+
+
+def _read_run(path: Path) -> Iterator[Tuple[tuple, str]]:
+    with path.open(encoding="utf-8") as fp:
+        for row in fp:
+            key, line = row.rstrip("\n").split("\t", 1)     # a chave em JSON não tem tab literal
+            yield tuple(json.loads(key)), line
+
+
+class ExternalSorter:
+    """Acumula (chave, linha) e devolve tudo ordenado pela chave; a linha não pode ter quebra de linha."""
+
+    def __init__(self, buffer_lines: int = BUFFER_LINES):
+        self.buffer_lines = buffer_lines
+        self._buffer: List[Tuple[tuple, str]] = []
+        self._runs: List[Path] = []
+        self._dir: Path | None = None
+
+    def add(self, key: tuple, line: str) -> None:
+        self._buffer.append((key, line))
+        if len(self._buffer) >= self.buffer_lines:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._dir is None:
+            self._dir = Path(tempfile.mkdtemp(prefix="extsort-"))
+        self._buffer.sort()
+        path = self._dir / f"{len(self._runs)}.run"
+        with path.open("w", encoding="utf-8") as fp:
+            for key, line in self._buffer:
+                fp.write(json.dumps(key, ensure_ascii=False) + "\t" + line + "\n")
+        self._runs.append(path)
+        self._buffer = []
+
+    def __iter__(self) -> Iterator[Tuple[tuple, str]]:
+        """(chave, linha) em ordem; consome o sorter e apaga as runs ao terminar."""
+        try:
+            if not self._runs:
+                self._buffer.sort()
+                yield from self._buffer
+                return
+            if self._buffer:
+                self._spill()
+            yield from heapq.merge(*(_read_run(path) for path in self._runs))   # mesma ordem (chave, linha) do sort
+        finally:
+            self._buffer, self._runs = [], []
+            if self._dir is not None:
+                shutil.rmtree(self._dir, ignore_errors=True)
+                self._dir = None
@@ -0,0 +1,166 @@
+"""
+Leitura de feeds RSS/Atom em streaming (plug‑ins das Juntas Comerciais).
+O XML é consumido conforme chega da rede por um parser incremental; cada
+<item>/<entry> vira um dict e é descartado em seguida, então a memória não
+cresce com o tamanho do feed. Os feeds vêm do mais novo para o mais antigo:
+ao encontrar EARLY_STOP_AFTER itens seguidos com data anterior à do item mais
+novo da execução anterior, a leitura para (e a conexão é fechada).
+
+Os lotes das execuções anteriores ficam guardados por feed (nome + URL) e são
+emitidos de novo junto com os novos, para o catálogo continuar completo; saem
+da guarda quando a data do leilão passa ou depois de KEEP_DAYS desde que
+foram lidos (aviso retirado do feed não é republicado para sempre).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, Iterator, List
+from xml.etree.ElementTree import XMLPullParser
+
+import aiohttp
+
+from scraper import fetch_auctions, net, normalize
+from scraper.cache import DiskCache
+from scraper.fetch_auctions import _AUCTION_SCHEMA, Auction, row_failed
+
+EARLY_STOP_AFTER = 5       # itens antigos seguidos que encerram a leitura (tolera feed fora de ordem)
+MAX_KEPT = 5000            # lotes guardados por feed para reemissão
+KEEP_DAYS = 30             # dias que um lote lido fica guardado para reemissão
+STATE_MAX_BYTES = 64 * 1024 ** 2
+
+logger = logging.getLogger("feeds")
+
+_ITEMS = {"item", "entry"}                   # RSS 2.0 / Atom
+_DATES = ("pubDate", "published", "updated", "date")
+
+_state: DiskCache | None = None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _item(elem) -> Dict[str, str]:
+    fields: Dict[str, str] = {}
+    for child in elem:
+        name = _local(child.tag)
+        if name == "link" and child.get("href"):         # Atom
+            fields.setdefault("link", child.get("href"))
+        elif name not in fields:
+            fields[name] = (child.text or "").strip()
+    fields["date"] = next((fields[d] for d in _DATES if fields.get(d)), "")
+    return fields
+
+
+def _when(text: str) -> datetime | None:
+    iso = normalize.parse_date(text) if text else None
+    return datetime.fromisoformat(iso) if iso else None
+
+
+def is_auction(title: str) -> bool:
+    return "leil" in title.lower()
+
+
+class _Reader:
+    """Parser incremental: recebe pedaços de bytes e devolve os itens completos."""
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._open: List = []               # elementos abertos, da raiz ao atual
+
+    def feed(self, chunk: bytes) -> Iterator[Dict[str, str]]:
+        self._parser.feed(chunk)
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._open.append(elem)
+                continue
+            self._open.pop()
+            if _local(elem.tag) in _ITEMS:
+                item = _item(elem)
+                if self._open:              # tira o item do <channel>/<feed>: não acumula
+                    self._open[-1].remove(elem)
+                yield item
+
+
+async def items(session: aiohttp.ClientSession, url: str, headers: dict,
+                since: datetime | None = None) -> AsyncIterator[Dict[str, str]]:
+    """Itens do feed mais novos que `since`, na ordem do feed."""
+    chunks = net.iter_chunks(session, url, headers)
+    reader = _Reader()
+    old_streak = 0
+    try:
+        async for chunk in chunks:
+            for item in reader.feed(chunk):
+                when = _when(item["date"])
+                if since is not None and when is not None and when < since:
+                    old_streak += 1
+                    if old_streak >= EARLY_STOP_AFTER:
+                        return
+                    continue
+                old_streak = 0
+                yield item
+    finally:
+        await chunks.aclose()
+
+
+def _keep(entry: dict, now: datetime) -> bool:
+    """Lote guardado ainda deve ser reemitido: leilão não passou e foi lido há menos de KEEP_DAYS."""
+    if now - datetime.fromisoformat(entry["read"]) > timedelta(days=KEEP_DAYS):
+        return False
+    when = _when(entry["lot"]["auction_date"])
+    return when is None or when.date() >= now.date()
+
+
+def _store() -> DiskCache:
+    global _state
+    root = fetch_auctions.CACHE_DIR / "feeds"      # lido a cada chamada: segue um CACHE_DIR redirecionado
+    if _state is None or _state.root != root:
+        _state = DiskCache(root, STATE_MAX_BYTES)
+    return _state
+
+
+async def fetch_feed(name: str, version: int, url: str, headers: dict,
+                     to_lot: Callable[[Dict[str, str]], Auction | None],
+                     match: Callable[[str], bool] = is_auction) -> AsyncIterator[Auction]:
+    """
+    Emite os lotes novos do feed (itens cujo título passa em `match`, convertidos
+    por `to_lot`) e, depois, os guardados das execuções anteriores.
+    """
+    key = f"{name}:{version}:{_AUCTION_SCHEMA}:{url}"
+    state = _store().get(key) or {"newest": None, "lots": []}
+    now = datetime.now(timezone.utc)
+    since = datetime.fromisoformat(state["newest"]) if state["newest"] else None
+    newest = since
+    fresh: List[Auction] = []
+    read = 0
+
+    async with net.session() as session:
+        async for item in items(session, url, headers, since):
+            read += 1
+            when = _when(item["date"])
+            if when is not None and (newest is None or when > newest):
+                newest = when
+            if not match(item.get("title", "")):
+                continue
+            try:
+                lot = to_lot(item)
+            except Exception as exc:
+                row_failed(exc)
+                continue
+            if lot is not None:
+                fresh.append(lot)
+                yield lot
+
+    ids = {lot.id for lot in fresh}
+    kept = [(entry["read"], Auction(**entry["lot"])) for entry in state["lots"]
+            if entry["lot"]["id"] not in ids and _keep(entry, now)]
+    for _, lot in kept:
+        yield lot
+    logger.info("%s: %d itens novos lidos, %d lotes novos, %d reemitidos", name, read, len(fresh), len(kept))
+    entries = [{"read": now.isoformat(), "lot": lot.to_json()} for lot in fresh]
+    entries += [{"read": read_at, "lot": lot.to_json()} for read_at, lot in kept]
+    _store().set(key, {
+        "newest": newest.isoformat() if newest else None,
+        "lots": entries[:MAX_KEPT],
+    })
@@ -1,24 +1,55 @@
 from __future__ import annotations
 
+import argparse
 import asyncio
-import json
+import csv
+import filecmp
+import hashlib
+import heapq
 import logging
 import importlib
-from dataclasses import asdict, dataclass
-from datetime import datetime
+import inspect
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, fields, replace
+from itertools import groupby
+from datetime import date, datetime
 from pathlib import Path
 from types import ModuleType
-from typing import Iterable, List
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 
-import pandas as pd
-from dateutil import parser as date_parser
 from tqdm import tqdm
 
+from scraper import artifacts, codec, geo, health, history, net, normalize, photos, profiling, scheduler, sharding
+from scraper.cache import DiskCache, body_hash
+from scraper.extsort import ExternalSorter
+from scraper.pipeline import Pipeline, Stage
+
 # ---------- Configurações globais ----------
 CONCURRENCY = 10           # workers paralelos
 MAX_AGE_DAYS = 0           # filtra imóveis já leiloados (0 = somente futuros)
+RUN_DEADLINE = 40 * 60     # prazo global da execução em segundos (fontes pendentes são canceladas)
+STAGE_WORKERS = {"normalização": 1, "filtro": 2, "geocodificação": 1}   # workers por estágio do pipeline
+NORMALIZE_BATCH = 256      # lotes normalizados por vez (coluna a coluna)
+CORE_SCRAPERS = True       # inclui os scrapers síncronos de scripts/core (BaseScraper)
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 PHOTOS_DIR = DATA_DIR / "photos"
+PHOTO_DEADLINE = 10 * 60   # segundos da fase de fotos, depois da gravação dos lotes
+SHARDS_DIR = DATA_DIR / "shards"               # saídas parciais de `--shard i/N`
+COSTS_FILE = DATA_DIR / "source_costs.json"    # custo histórico por fonte (equilíbrio dos shards)
+SCHEDULE_FILE = DATA_DIR / "source_schedule.json"   # taxa de mudança por fonte (`--scheduled`)
+HEALTH_FILE = DATA_DIR / "source_health.json"  # falhas seguidas e quarentena por fonte
+SOURCES_DIR = DATA_DIR / "sources"             # NDJSON canônico por fonte (versionado no git)
+SITE_DIR = DATA_DIR / "site"                   # JSON minificado com hash no nome + .gz/.br e ponteiro
+PROFILE_DIR = DATA_DIR / "profile"             # saída de `--profile` (pilhas dobradas por fonte)
+CACHE_DIR = DATA_DIR / "cache"
+PARSE_CACHE = True                             # reaproveita o parse de páginas idênticas
+PARSE_CACHE_MAX_BYTES = 256 * 1024 ** 2
+PHOTO_QUEUE_FILE = CACHE_DIR / "photo_queue.json"   # fotos que falharam, tentadas de novo na próxima execução
+GEOCODE = True                                 # lat/lon/geohash offline a partir de `location`
+GEO_DIR = DATA_DIR / "geo"                     # agrupamentos e blocos de lotes para o mapa
+HISTORY_FILE = DATA_DIR / "history" / "prices.sqlite"   # série de preços por lote (só mudanças)
 SOURCES_PACKAGE = "scraper.sources"
 
 logging.basicConfig(
@@ -34,28 +65,175 @@ class Auction:
     source: str
     id: str
     title: str
-    auction_date: str          # ISO‑8601
+    auction_date: str          # ISO‑8601 após a normalização (plug‑ins emitem o texto do site)
     location: str
     price: str
     photo_path: str
     url: str
+    price_cents: int | None = None   # preenchido pela normalização
+    lat: float | None = None   # preenchidos pelo estágio de geocodificação
+    lon: float | None = None
+    geohash: str = ""
 
     def to_json(self) -> dict:
-        return asdict(self)
+        # campos são escalares: cópia rasa basta (asdict copiaria recursivamente)
+        return {name: getattr(self, name) for name in _AUCTION_FIELDS}
+
+
+_AUCTION_FIELDS = tuple(f.name for f in fields(Auction))
+_TEXT_FIELDS = tuple(f.name for f in fields(Auction) if f.type == "str")
+
+
+def _invalid(lot) -> str | None:
+    """Motivo pelo qual a saída de um plug‑in não é um Auction válido (None se for)."""
+    if not isinstance(lot, Auction):
+        return f"tipo {type(lot).__name__}"
+    for name in _TEXT_FIELDS:
+        if not isinstance(getattr(lot, name), str):
+            return f"campo {name} não é str"
+    if not lot.source or not lot.id:
+        return "source/id vazio"
+    return None
+
+
+_row_errors: Dict[str, int] = {}
+_rejected: Dict[str, int] = {}        # saídas de plug‑in reprovadas em _invalid, por fonte
+
+
+def row_failed(exc: Exception) -> None:
+    """Conta uma linha descartada da fonte em execução (resumo no fim da execução)."""
+    source = net.current_source.get()
+    _row_errors[source] = _row_errors.get(source, 0) + 1
+    logger.debug("%s: linha descartada: %r", source, exc)
+
+
+def _accept(lot, source: str) -> bool:
+    reason = _invalid(lot)
+    if reason is None:
+        _seen.setdefault(source, set()).add((lot.source, lot.id, lot.price, lot.auction_date))
+        return True
+    _rejected[source] = _rejected.get(source, 0) + 1
+    logger.debug("%s: registro rejeitado (%s)", source, reason)
+    return False
+
+
+def parse_each(parse: Callable[..., Auction | None], items: Iterable, *args) -> Iterator[Auction]:
+    """
+    Aplica `parse(item, *args)` a cada linha/card da listagem. Uma linha com erro
+    (data malformada, campo ausente) é descartada sem derrubar a fonte inteira.
+    """
+    for item in items:
+        try:
+            lot = parse(item, *args)
+        except Exception as exc:
+            row_failed(exc)
+            continue
+        if lot is not None:
+            yield lot
+
+
+# ---------- Cache de parse ----------
+# muda sozinho quando os campos de Auction mudam, invalidando o que foi gravado antes
+_AUCTION_SCHEMA = hashlib.sha1(",".join(_AUCTION_FIELDS).encode()).hexdigest()[:8]
+_parse_cache: DiskCache | None = None
+
+
+def _get_parse_cache() -> DiskCache:
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = DiskCache(CACHE_DIR / "parse", PARSE_CACHE_MAX_BYTES)
+    return _parse_cache
+
+
+def _parse_key(namespace: str, version: int, body: str | bytes) -> str:
+    return f"{namespace}:{version}:{_AUCTION_SCHEMA}:{body_hash(body)}"
+
+
+def _redefer_photos(origins: Dict[str, str]) -> None:
+    """Lotes servidos do cache: registra de novo as fotos que não estão no disco (as que estão, defer ignora)."""
+    for path, url in origins.items():
+        photos.defer(url, (PHOTOS_DIR.parent / path).parent)
+
+
+def cached_lots(namespace: str, version: int, body: str | bytes) -> List[Auction] | None:
+    """
+    Lotes já extraídos deste mesmo corpo de resposta pela mesma versão do parser.
+    O plug‑in declara PARSER_VERSION e o incrementa ao mudar o parse, o que invalida o cache.
+    """
+    if not PARSE_CACHE:
+        return None
+    entry = _get_parse_cache().get(_parse_key(namespace, version, body))
+    if entry is None:
+        return None
+    if isinstance(entry, list):          # formato antigo: só os lotes, sem a origem das fotos
+        entry = {"lots": entry, "photos": {}}
+    _redefer_photos(entry["photos"])
+    return [Auction(**r) for r in entry["lots"]]
+
+
+def store_lots(namespace: str, version: int, body: str | bytes, lots: List[Auction]) -> None:
+    if PARSE_CACHE:
+        _get_parse_cache().set(_parse_key(namespace, version, body),
+                               {"lots": [a.to_json() for a in lots], "photos": photos.origins(lots)})
+
+
+class LotCache:
+    """
+    Cache persistente de lotes por URL de detalhe, com TTL por entrada e LRU por tamanho.
+    Lote dentro da validade é servido sem requisição nenhuma.
+    """
+
+    def __init__(self, name: str, version: int, max_bytes: int):
+        self._disk = DiskCache(CACHE_DIR / "lots" / name, max_bytes)
+        self._prefix = f"{version}:{_AUCTION_SCHEMA}:"
+
+    def get(self, url: str, allow_expired: bool = False, tag: str = "") -> Auction | None:
+        """`tag` é a versão anunciada pela fonte (lastmod do sitemap): outra versão é falta."""
+        entry = self._disk.get(f"{self._prefix}{url}#{tag}", allow_expired)
+        if entry is None:
+            return None
+        if "lot" not in entry:           # formato antigo: o registro puro, sem a origem da foto
+            entry = {"lot": entry, "photos": {}}
+        _redefer_photos(entry["photos"])
+        return Auction(**entry["lot"])
+
+    def put(self, lot: Auction, ttl: float, tag: str = "") -> None:
+        self._disk.set(f"{self._prefix}{lot.url}#{tag}", {"lot": lot.to_json(), "photos": photos.origins([lot])}, ttl)
 
 
 # ---------- Descoberta dinâmica de plug‑ins ----------
-def _discover_sources() -> List[ModuleType]:
-    """Importa todos os módulos em scraper/sources/ que tenham fetch() assíncrono."""
+def _source_names() -> List[str]:
+    """Módulos candidatos a plug‑in em scraper/sources/, em ordem."""
     pkg_path = Path(__file__).parent / "sources"
+    return [f"{SOURCES_PACKAGE}.{file.stem}" for file in sorted(pkg_path.glob("*.py"))
+            if not file.name.startswith("_") and not file.stem.endswith("_template")]
+
+
+def _current_health(state: Dict[str, dict]) -> Dict[str, dict]:
+    """Descarta da saúde os plug‑ins cujo arquivo não existe mais (removidos ou que nunca foram fonte)."""
+    known = set(_source_names())
+    return {name: entry for name, entry in state.items()
+            if not name.startswith(SOURCES_PACKAGE + ".") or name in known}
+
+
+def _discover_sources() -> List[ModuleType]:
+    """
+    Importa todos os módulos em scraper/sources/ que tenham fetch() assíncrono.
+    Dois formatos são aceitos: corrotina que retorna List[Auction] ou
+    gerador assíncrono que emite Auction (ou lotes de Auction) conforme lê.
+    Modelos (*_template.py, com {{UF}} por preencher) não são fontes.
+    """
     modules: List[ModuleType] = []
 
-    for file in pkg_path.glob("*.py"):
-        if file.name.startswith("_"):
+    for module_name in _source_names():
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as exc:           # plug‑in quebrado não derruba a descoberta
+            logger.error("Falha ao importar %s: %s", module_name, exc)
+            _failures[module_name] = health.describe(exc)
             continue
-        module_name = f"{SOURCES_PACKAGE}.{file.stem}"
-        module = importlib.import_module(module_name)
-        if asyncio.iscoroutinefunction(getattr(module, "fetch", None)):
+        fetch = getattr(module, "fetch", None)
+        if asyncio.iscoroutinefunction(fetch) or inspect.isasyncgenfunction(fetch):
             modules.append(module)
         else:
             logger.warning("Ignorando %s: não possui fetch() async", module_name)
@@ -63,76 +241,544 @@ def _discover_sources() -> List[ModuleType]:
 
 
 # ---------- Funções auxiliares ----------
-def _filter_future_auctions(auctions: Iterable[Auction]) -> List[Auction]:
-    today = datetime.utcnow().date()
-    keep: List[Auction] = []
+def _is_future(auction: Auction, today=None) -> bool:
+    today = today or datetime.utcnow().date()
+    try:
+        auction_dt = date.fromisoformat(auction.auction_date[:10])    # já normalizada
+    except ValueError:
+        logger.debug("Data inválida para %s – mantendo mesmo assim", auction.id)   # está no relatório da normalização
+        return True
+    return auction_dt >= today
+
+
+class _JsonArrayWriter:
+    """Grava um array JSON registro a registro, no mesmo formato de json.dumps(indent=2)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._tmp = path.with_name(path.name + ".tmp")
+        self._fp = None
+        self.count = 0
+
+    def open(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self._fp = self._tmp.open("w", encoding="utf-8")
+        self._fp.write("[")
+
+    def write(self, record: dict) -> None:
+        body = codec.dumps(record, indent=True).replace("\n", "\n  ")
+        self._fp.write(("," if self.count else "") + "\n  " + body)
+        self.count += 1
+
+    def close(self) -> None:
+        self._fp.write("\n]" if self.count else "]")
+        self._fp.close()
+        self._tmp.replace(self.path)     # só publica o arquivo completo
+
+
+class _CsvWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._tmp = path.with_name(path.name + ".tmp")
+        self._fp = None
+        self._writer = None
+
+    def open(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self._fp = self._tmp.open("w", encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._fp, fieldnames=_AUCTION_FIELDS, lineterminator="\n")
+        self._writer.writeheader()
+
+    def write(self, record: dict) -> None:
+        self._writer.writerow(record)
+
+    def close(self) -> None:
+        self._fp.close()
+        self._tmp.replace(self.path)
+
+
+class _SortedNdjsonWriter:
+    """Saída parcial de um shard: um registro por linha, em ordem canônica (source, id)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._sorter = ExternalSorter()      # memória limitada ao buffer, não ao shard
+        self.count = 0
+
+    def open(self) -> None:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+
+    def write(self, record: dict) -> None:
+        self._sorter.add(_record_key(record), codec.dumps(record))
+        self.count += 1
+
+    def close(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            for _, line in self._sorter:
+                fp.write(line + "\n")
+        tmp.replace(self.path)
+
+
+class _SourceFilesWriter:
+    """
+    Um NDJSON por fonte, ordenado por id, um registro por linha e campos na
+    ordem de Auction: fonte sem mudança gera arquivo idêntico (e diff vazio).
+    Arquivos de fontes que não têm mais lotes são removidos. As linhas passam
+    por uma ordenação externa por (arquivo, source, id) e cada arquivo é gravado
+    em streaming, então a memória não cresce com o catálogo.
+    """
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self._sorter = ExternalSorter()
+        self.count = 0
+
+    def open(self) -> None:
+        self.out_dir.mkdir(exist_ok=True, parents=True)
+
+    def write(self, record: dict) -> None:
+        self._sorter.add((_slug(record["source"]), *_record_key(record)), codec.dumps(record))
+        self.count += 1
+
+    def _write_file(self, path: Path, lines: Iterable[str]) -> bool:
+        """Grava `path` em streaming; devolve se o conteúdo mudou (arquivo igual fica intocado)."""
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fp:
+            for line in lines:
+                fp.write(line + "\n")
+        if path.exists() and filecmp.cmp(tmp, path, shallow=False):
+            tmp.unlink()
+            return False
+        tmp.replace(path)
+        return True
+
+    def close(self) -> None:
+        written, changed = set(), 0
+        for slug, group in groupby(self._sorter, key=lambda item: item[0][0]):
+            path = self.out_dir / f"{slug}.ndjson"
+            written.add(path.name)
+            changed += self._write_file(path, (line for _, line in group))
+        removed = [p for p in self.out_dir.glob("*.ndjson") if p.name not in written]
+        for path in removed:
+            path.unlink()
+        logger.info("Arquivos por fonte: %d alterados, %d iguais, %d removidos",
+                    changed, len(written) - changed, len(removed))
+
+
+def _slug(source: str) -> str:
+    """'Mega Leilões' → 'mega-leiloes' (nome de arquivo estável por fonte)."""
+    text = unicodedata.normalize("NFKD", source).encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-") or "sem-fonte"
+
+
+class _GeoWriter:
+    """Alimenta o índice de agrupamentos do mapa e o exporta ao fechar."""
+
+    def __init__(self, out_dir: Path):
+        self.out_dir = out_dir
+        self._index = geo.ClusterIndex()
+
+    def open(self) -> None:
+        pass
+
+    def write(self, record: dict) -> None:
+        self._index.add(record)
+
+    def close(self) -> None:
+        self._index.export(self.out_dir)
+
+
+class _HistoryWriter:
+    """Registra no histórico de preços os lotes novos ou que mudaram de preço/data."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._store: history.PriceHistory | None = None
+
+    def open(self) -> None:
+        self._store = history.PriceHistory(self.path)
+
+    def write(self, record: dict) -> None:
+        self._store.add(record)
+
+    def close(self) -> None:
+        self._store.commit()
+        self._store.close()
 
-    for a in auctions:
-        try:
-            auction_dt = date_parser.isoparse(a.auction_date).date()
-        except ValueError:
-            logger.warning("Data inválida para %s – mantendo mesmo assim", a.id)
-            keep.append(a)
-            continue
 
-        if auction_dt >= today:
-            keep.append(a)
-    return keep
+def _catalog_writers() -> list:
+    """Saídas do catálogo completo (execução única ou merge dos shards)."""
+    writers = [_JsonArrayWriter(DATA_DIR / "auctions.json"), _CsvWriter(DATA_DIR / "auctions.csv"),
+               _SourceFilesWriter(SOURCES_DIR), artifacts.ArtifactWriter(SITE_DIR), _HistoryWriter(HISTORY_FILE)]
+    if GEOCODE:
+        writers.append(_GeoWriter(GEO_DIR))
+    return writers
 
 
-def _save_to_json(auctions: List[Auction]) -> None:
-    DATA_DIR.mkdir(exist_ok=True, parents=True)
-    out_file = DATA_DIR / "auctions.json"
-    logger.info("Gravando %s com %d registros", out_file, len(auctions))
-    out_file.write_text(json.dumps([a.to_json() for a in auctions], indent=2, ensure_ascii=False))
+def _geocode(lot: Auction) -> Auction:
+    found = geo.locate(lot.location, geo.uf_from_source(lot.source))
+    if found is None:
+        return lot
+    lat, lon, gh = found
+    return replace(lot, lat=lat, lon=lon, geohash=gh)
 
 
-def _save_to_csv(auctions: List[Auction]) -> None:
-    df = pd.DataFrame([a.to_json() for a in auctions])
-    csv_file = DATA_DIR / "auctions.csv"
-    logger.info("Gerando CSV %s", csv_file)
-    df.to_csv(csv_file, index=False, encoding="utf-8-sig")
+def _record_key(record: dict) -> tuple:
+    return record["source"], record["id"]
 
 
 # ---------- Orquestração ----------
-async def _collect_from_source(module: ModuleType) -> List[Auction]:
+_run_costs: Dict[str, float] = {}     # segundos gastos por fonte nesta execução
+_seen: Dict[str, set] = {}            # fonte -> (rótulo, id, preço, data) emitidos, para a agenda
+_completed: set = set()               # fontes que terminaram sem falha nem cancelamento
+_failures: Dict[str, str] = {}        # fonte -> erro que a derrubou nesta execução
+_probes: set = set()                  # fontes em quarentena rodando como sonda
+
+
+async def _run_fetch(module: ModuleType, pipeline: Pipeline) -> List[Auction]:
+    if inspect.isasyncgenfunction(module.fetch):
+        emitted = 0
+        try:
+            async for item in module.fetch(PHOTOS_DIR):
+                for lot in item if isinstance(item, (list, tuple)) else (item,):
+                    if _accept(lot, module.__name__):
+                        await pipeline.put(lot)
+                        emitted += 1
+            _completed.add(module.__name__)
+        except Exception as exc:
+            # o que já foi emitido segue no pipeline
+            logger.exception("Falha em %s após %d registros: %s", module.__name__, emitted, exc)
+            _failures[module.__name__] = health.describe(exc)
+        return []
+
     try:
-        logger.info("Coletando %s", module.__name__)
         result: Iterable[Auction] = await module.fetch(PHOTOS_DIR)
-        return list(result)
+        lots = [lot for lot in result if _accept(lot, module.__name__)]
+        _completed.add(module.__name__)
+        return lots
     except Exception as exc:
         logger.exception("Falha em %s: %s", module.__name__, exc)
+        _failures[module.__name__] = health.describe(exc)
         return []
 
 
-async def _gather_all() -> List[Auction]:
-    modules = _discover_sources()
-    PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
+async def _collect_from_source(module: ModuleType, pipeline: Pipeline) -> List[Auction]:
+    """
+    Roda o fetch() de um plug‑in. Geradores alimentam o pipeline lote a lote e
+    retornam []; plug‑ins de lista devolvem seus lotes para o orquestrador empurrar.
+    Fonte em quarentena roda como sonda: sem retries e com prazo curto.
+    """
+    net.current_source.set(module.__name__)
+    probe = module.__name__ in _probes
+    net.probing.set(probe)
+    logger.info("%s %s", "Sondando" if probe else "Coletando", module.__name__)
+    started = time.monotonic()
+
+    try:
+        async with asyncio.timeout(health.PROBE_TIMEOUT if probe else None):
+            return await _run_fetch(module, pipeline)
+    except TimeoutError:
+        logger.warning("Sonda de %s sem resposta em %ds", module.__name__, health.PROBE_TIMEOUT)
+        _failures[module.__name__] = "TimeoutError: sonda"
+        return []
+    finally:
+        _run_costs[module.__name__] = time.monotonic() - started
 
-    auctions: List[Auction] = []
+
+async def _produce(pipeline: Pipeline, modules: List[ModuleType], replay: List[Auction] = ()) -> None:
+    """
+    Estágio de coleta: roda os plug‑ins e empurra os lotes de cada fonte no pipeline.
+    `replay` traz os lotes da saída anterior das fontes que a agenda deixou de fora.
+    """
+    for lot in replay:
+        await pipeline.put(lot)
     sem = asyncio.Semaphore(CONCURRENCY)
 
     async def _wrap(m: ModuleType):
         async with sem:
-            return await _collect_from_source(m)
+            return await _collect_from_source(m, pipeline)
+
+    tasks = {asyncio.create_task(_wrap(m), name=m.__name__): m.__name__ for m in modules}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + RUN_DEADLINE
+
+    pending = set(tasks)
+    with tqdm(total=len(tasks), desc="Fontes") as bar:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                for lot in task.result():
+                    await pipeline.put(lot)
+                bar.update()
+
+    await _cancel_late(pending, tasks)
+    if net.open_circuits():
+        logger.warning("Hosts com circuito aberto: %s", ", ".join(net.open_circuits()))
+
+
+async def _cancel_late(pending: set, tasks: Dict[asyncio.Task, str]) -> None:
+    """Prazo global esgotado: cancela o que falta; o que cada fonte já emitiu está no pipeline."""
+    if not pending:
+        return
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    for task in pending:
+        logger.warning("Prazo global esgotado: %s cancelada com %d registros parciais",
+                       tasks[task], len(_seen.get(tasks[task], ())))
+
+
+def _observations() -> Dict[str, dict]:
+    """Impressão digital e custo de cada fonte concluída nesta execução, para a agenda."""
+    observed = {}
+    for name in _completed:
+        lots = sorted(_seen.get(name, ()))
+        stats = net.transfer_stats.get(name)
+        observed[name] = {
+            "hash": hashlib.sha1(repr(lots).encode("utf-8")).hexdigest(),
+            "requests": stats.requests if stats else 0,
+            "labels": sorted({label for label, *_ in lots}),
+        }
+    return observed
+
+
+def _outcomes() -> Dict[str, str | None]:
+    """Resultado de cada fonte nesta execução (None = sucesso); canceladas pelo prazo ficam de fora."""
+    return {**{name: None for name in _completed}, **_failures}
+
+
+def _replay(labels: set) -> List[Auction]:
+    """Lotes da saída anterior cujas fontes não rodam agora (ficam como estavam)."""
+    previous = DATA_DIR / "auctions.json"
+    if not labels or not previous.exists():
+        return []
+    return [Auction(**{k: v for k, v in record.items() if k in _AUCTION_FIELDS})
+            for record in codec.loads(previous.read_bytes()) if record["source"] in labels]
+
+
+def _reset_run_state() -> None:
+    _run_costs.clear()
+    _seen.clear()
+    _completed.clear()
+    _failures.clear()
+    net.transfer_stats.clear()
+    _row_errors.clear()
+    _rejected.clear()
+    normalize.reset()
+
+
+def _shard_phase(modules: List[ModuleType], shard: Tuple[int, int] | None) -> Tuple[List[ModuleType], list]:
+    """Fontes desta execução e seus gravadores: catálogo completo ou só a saída parcial do shard."""
+    if shard is None:
+        return modules, _catalog_writers()
+    index, total = shard
+    mine = set(sharding.assign([m.__name__ for m in modules], total, sharding.load_costs(COSTS_FILE))[index])
+    modules = [m for m in modules if m.__name__ in mine]
+    logger.info("Shard %d/%d: %d fontes", index, total, len(modules))
+    return modules, [_SortedNdjsonWriter(SHARDS_DIR / f"shard-{index}-of-{total}.ndjson")]
+
+
+def _quarantine_phase(modules: List[ModuleType]) -> List[ModuleType]:
+    """Tira as fontes em quarentena; as que estão na hora da sonda rodam como sondas."""
+    probes, held = health.split(health.load(HEALTH_FILE), [m.__name__ for m in modules], datetime.utcnow())
+    _probes.clear()
+    _probes.update(probes)
+    if held:
+        modules = [m for m in modules if m.__name__ not in held]
+        logger.info("Quarentena: %d fontes fora desta execução, %d sondas", len(held), len(probes))
+    return modules
+
+
+def _schedule_phase(modules: List[ModuleType], force: Iterable[str],
+                    skip: Iterable[str]) -> Tuple[List[ModuleType], set]:
+    """Fontes vencidas na agenda (mais `force`, menos `skip`) e os rótulos das que ficam de fora."""
+    state = scheduler.load_state(SCHEDULE_FILE)
+    due = (scheduler.due(state, [m.__name__ for m in modules], datetime.utcnow()) | set(force)) - set(skip)
+    logger.info("Agenda: %d de %d fontes vencidas", len(due), len(modules))
+    # fonte pausada que nunca rodou ainda não tem entrada (nem rótulos) na agenda
+    labels = {label for m in modules if m.__name__ not in due
+              for label in state.get(m.__name__, {}).get("labels", ())}
+    return [m for m in modules if m.__name__ in due], labels
 
-    tasks = [_wrap(m) for m in modules]
 
-    for coro in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Fontes"):
-        auctions.extend(await coro)
+def _build_pipeline(writers: list) -> Pipeline:
+    """normalização → filtro → geocodificação (opcional) → gravação nos `writers`."""
+    today = datetime.utcnow().date()
 
-    if MAX_AGE_DAYS == 0:
-        auctions = _filter_future_auctions(auctions)
+    def _filter(lot: Auction) -> Auction | None:
+        return lot if MAX_AGE_DAYS != 0 or _is_future(lot, today) else None
+
+    def _sink(lot: Auction) -> None:
+        record = lot.to_json()
+        for w in writers:
+            w.write(record)
+
+    stages = [
+        Stage("normalização", normalize.normalize_batch, workers=STAGE_WORKERS["normalização"],
+              batch=NORMALIZE_BATCH),
+        Stage("filtro", _filter, workers=STAGE_WORKERS["filtro"]),
+    ]
+    if GEOCODE:
+        stages.append(Stage("geocodificação", _geocode, workers=STAGE_WORKERS["geocodificação"]))
+    stages.append(Stage("gravação", _sink, workers=1))     # escrita sequencial nos arquivos
+    return Pipeline(stages)
+
+
+async def _photo_phase() -> None:
+    """Lotes já publicados: só agora as fotos, cada uma isolada das demais."""
+    await photos.download_all(PHOTO_QUEUE_FILE, PHOTO_DEADLINE)
+
+
+def _report_run(pipeline: Pipeline) -> None:
+    pipeline.report()
+    normalize.report()
+    if _row_errors:
+        logger.warning("Linhas descartadas por erro de parse: %s",
+                       ", ".join(f"{name}={n}" for name, n in sorted(_row_errors.items())))
+    if _rejected:
+        logger.warning("Registros rejeitados na validação: %s",
+                       ", ".join(f"{name}={n}" for name, n in sorted(_rejected.items())))
+    net.log_transfer_stats()
+    if _parse_cache is not None:
+        logger.info("Cache de parse: %d acertos, %d faltas", _parse_cache.hits, _parse_cache.misses)
+
+
+def _save_run_state(shard: Tuple[int, int] | None) -> None:
+    """Custos, agenda e saúde das fontes: consolidados ou, num shard, parciais para o `merge`."""
+    if shard is None:
+        sharding.save_costs(COSTS_FILE, sharding.update_costs(sharding.load_costs(COSTS_FILE), _run_costs))
+        scheduler.save_state(SCHEDULE_FILE, scheduler.observe(
+            scheduler.load_state(SCHEDULE_FILE), _observations(), datetime.utcnow()))
+        state = health.update(_current_health(health.load(HEALTH_FILE)), _outcomes(), datetime.utcnow())
+        health.save(HEALTH_FILE, state)
+        health.report(state)
+    else:
+        sharding.save_costs(SHARDS_DIR / f"costs-{shard[0]}-of-{shard[1]}.json", _run_costs)
+        scheduler.save_state(SHARDS_DIR / f"schedule-{shard[0]}-of-{shard[1]}.json", _observations())
+        health.save(SHARDS_DIR / f"health-{shard[0]}-of-{shard[1]}.json", _outcomes())
+
+
+async def _gather_all(shard: Tuple[int, int] | None = None, scheduled: bool = False, *,
+                      force: Iterable[str] = (), skip: Iterable[str] = (), keep_open: bool = False) -> int:
+    """
+    Roda coleta → filtro → gravação; os lotes chegam aos arquivos assim que são lidos.
+    Com `shard=(i, N)` roda só as fontes do shard i e grava uma saída parcial para o `merge`.
+    Com `scheduled` roda só as fontes vencidas na agenda (mais `force`, menos `skip`);
+    as demais repetem a saída anterior. `keep_open` mantém sessões HTTP e o pool dos
+    scrapers síncronos abertos para a próxima execução (modo daemon).
+    """
+    from scraper import core_scrapers     # import tardio: core_scrapers importa Auction daqui
+
+    _reset_run_state()
+    modules = _discover_sources()
+    if CORE_SCRAPERS:
+        modules += core_scrapers.discover()
+    PHOTOS_DIR.mkdir(parents=True, exist_ok=True)
 
-    logger.info("Total de registros coletados: %d", len(auctions))
-    return auctions
+    modules, writers = _shard_phase(modules, shard)
+    modules = _quarantine_phase(modules)
+    replay: List[Auction] = []
+    if scheduled:
+        modules, labels = _schedule_phase(modules, force, skip)
+        replay = _replay(labels)
+        logger.info("Agenda: %d lotes repetidos da saída anterior", len(replay))
+    pipeline = _build_pipeline(writers)
+
+    for w in writers:
+        w.open()
+    try:
+        await pipeline.run(lambda p: _produce(p, modules, replay))
+        for w in writers:
+            w.close()
+        await _photo_phase()
+    finally:
+        if not keep_open:
+            await net.aclose()
+            core_scrapers.shutdown()
+
+    _report_run(pipeline)
+    _save_run_state(shard)
+    logger.info("Total de registros gravados: %d", writers[0].count)
+    return writers[0].count
+
+
+def _read_ndjson(path: Path) -> Iterator[dict]:
+    with path.open(encoding="utf-8") as fp:
+        for line in fp:
+            yield codec.loads(line)
+
+
+def merge_shards(shards_dir: Path = SHARDS_DIR) -> int:
+    """
+    Junta as saídas parciais dos shards (k‑way merge) em auctions.json/CSV na
+    ordem canônica (source, id), descartando duplicatas, e consolida custos, agenda e saúde.
+    """
+    files = sorted(shards_dir.glob("shard-*.ndjson"))
+    if not files:
+        raise FileNotFoundError(f"nenhuma saída parcial em {shards_dir}")
+
+    writers = _catalog_writers()
+    for w in writers:
+        w.open()
+    last_key, duplicates = None, 0
+    for record in heapq.merge(*(_read_ndjson(f) for f in files), key=_record_key):
+        key = _record_key(record)
+        if key == last_key:
+            duplicates += 1
+            continue
+        last_key = key
+        for w in writers:
+            w.write(record)
+    for w in writers:
+        w.close()
+
+    observed: Dict[str, float] = {}
+    for costs_file in sorted(shards_dir.glob("costs-*.json")):
+        observed.update(sharding.load_costs(costs_file))
+    sharding.save_costs(COSTS_FILE, sharding.update_costs(sharding.load_costs(COSTS_FILE), observed))
+    changes: Dict[str, dict] = {}
+    for schedule_file in sorted(shards_dir.glob("schedule-*.json")):
+        changes.update(scheduler.load_state(schedule_file))
+    scheduler.save_state(SCHEDULE_FILE, scheduler.observe(
+        scheduler.load_state(SCHEDULE_FILE), changes, datetime.utcnow()))
+    outcomes: Dict[str, str | None] = {}
+    for health_file in sorted(shards_dir.glob("health-*.json")):
+        outcomes.update(health.load(health_file))
+    state = health.update(_current_health(health.load(HEALTH_FILE)), outcomes, datetime.utcnow())
+    health.save(HEALTH_FILE, state)
+    health.report(state)
+
+    logger.info("Merge de %d shards: %d registros (%d duplicados descartados)",
+                len(files), writers[0].count, duplicates)
+    return writers[0].count
 
 
 def main() -> None:
-    auctions = asyncio.run(_gather_all())
-    _save_to_json(auctions)
-    _save_to_csv(auctions)
+    parser = argparse.ArgumentParser(description="Coleta de leilões")
+    parser.add_argument("command", nargs="?", choices=("run", "merge"), default="run",
+                        help="run (padrão) coleta; merge junta as saídas de data/shards/")
+    parser.add_argument("--shard", help="i/N: roda só o shard i de N e grava a saída parcial")
+    parser.add_argument("--scheduled", action="store_true",
+                        help="roda só as fontes vencidas na agenda adaptativa (data/source_schedule.json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="perfil por fonte por amostragem e monitor de bloqueios do laço (data/profile/)")
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        merge_shards()
+    else:
+        run = _gather_all(sharding.parse_shard(args.shard) if args.shard else None, args.scheduled)
+        asyncio.run(profiling.run(run, PROFILE_DIR) if args.profile else run)
 
 
 if __name__ == "__main__":
-    main()
+    # `python -m scraper.fetch_auctions` roda este arquivo como __main__, mas os
+    # plug‑ins importam scraper.fetch_auctions: delega ao módulo importado para
+    # que Auction, _row_errors e demais estados sejam um só
+    from scraper import fetch_auctions
+    fetch_auctions.main()
@@ -0,0 +1,237 @@
+"""
+Geocodificação offline do campo `location`.
+Nomes de municípios normalizados (sem acento, minúsculos) ficam numa trie com
+busca aproximada por distância de edição; a UF vem do próprio texto
+("Campinas/SP") ou da fonte (TJSP → SP). Sem município reconhecido, usa o
+centro da UF com geohash curto, sinalizando a precisão menor.
+
+O gazetteer embutido (municipios.csv) traz os municípios do IBGE com código,
+nome, coordenadas da sede e codigo_uf; é regerado por scripts/gerar_municipios.py.
+Outro CSV com as colunas nome, latitude, longitude e uf ou codigo_uf também serve.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import re
+import shutil
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from scraper import codec
+
+GAZETTEER_FILE = Path(__file__).with_name("municipios.csv")
+CITY_PRECISION = 7         # ~150 m: município reconhecido
+UF_PRECISION = 3           # ~150 km: só a UF é conhecida
+CLUSTER_PRECISIONS = (3, 4, 5)   # níveis de agrupamento exportados para o mapa
+TILE_PRECISION = 4         # lotes são exportados em blocos deste nível de geohash
+
+logger = logging.getLogger("geo")
+
+IBGE_UF = {
+    "11": "RO", "12": "AC", "13": "AM", "14": "RR", "15": "PA", "16": "AP", "17": "TO",
+    "21": "MA", "22": "PI", "23": "CE", "24": "RN", "25": "PB", "26": "PE", "27": "AL",
+    "28": "SE", "29": "BA", "31": "MG", "32": "ES", "33": "RJ", "35": "SP", "41": "PR",
+    "42": "SC", "43": "RS", "50": "MS", "51": "MT", "52": "GO", "53": "DF",
+}
+
+# centro aproximado de cada UF
+UF_CENTROIDS: Dict[str, Tuple[float, float]] = {
+    "AC": (-9.0, -70.5), "AL": (-9.6, -36.6), "AM": (-4.2, -64.6), "AP": (1.4, -51.8),
+    "BA": (-12.6, -41.7), "CE": (-5.2, -39.5), "DF": (-15.8, -47.8), "ES": (-19.6, -40.6),
+    "GO": (-15.9, -49.6), "MA": (-5.0, -45.3), "MG": (-18.5, -44.6), "MS": (-20.6, -54.5),
+    "MT": (-12.9, -55.9), "PA": (-3.8, -52.5), "PB": (-7.2, -36.6), "PE": (-8.4, -37.9),
+    "PI": (-7.4, -42.7), "PR": (-24.6, -51.6), "RJ": (-22.3, -42.6), "RN": (-5.8, -36.6),
+    "RO": (-10.9, -62.8), "RR": (2.1, -61.4), "RS": (-29.7, -53.2), "SC": (-27.2, -50.5),
+    "SE": (-10.6, -37.4), "SP": (-22.3, -48.7), "TO": (-10.2, -48.3),
+}
+
+_PREFIXES = re.compile(r"^(comarca|foro regional|foro|municipio|cidade) (de |do |da )?")
+_WITH_UF = re.compile(r"^(.*?)[\s/,\-–()]+([A-Za-z]{2})\)?$")
+_TJ_SOURCE = re.compile(r"^TJ(DFT|[A-Z]{2})$")
+
+
+# ---------- Geohash ----------
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lon: float, precision: int = CITY_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+# ---------- Gazetteer ----------
+def normalize(name: str) -> str:
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+    return _PREFIXES.sub("", text)
+
+
+class _Trie:
+    """Trie de nomes normalizados com busca por distância de Levenshtein limitada."""
+
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, _Trie] = {}
+        self.values: List[tuple] = []
+
+    def insert(self, key: str, value: tuple) -> None:
+        node = self
+        for char in key:
+            node = node.children.setdefault(char, _Trie())
+        node.values.append(value)
+
+    def search(self, word: str, max_dist: int) -> Tuple[int, List[tuple]]:
+        """Valores do(s) nome(s) mais próximos de `word` dentro de `max_dist` edições."""
+        best: List = [max_dist + 1, []]
+        first_row = list(range(len(word) + 1))
+        for char, child in self.children.items():
+            child._walk(char, word, first_row, best)
+        return (best[0], best[1]) if best[0] <= max_dist else (best[0], [])
+
+    def _walk(self, char: str, word: str, prev_row: List[int], best: List) -> None:
+        row = [prev_row[0] + 1]
+        for i in range(1, len(word) + 1):
+            cost = 0 if word[i - 1] == char else 1
+            row.append(min(row[i - 1] + 1, prev_row[i] + 1, prev_row[i - 1] + cost))
+        if self.values:
+            if row[-1] < best[0]:
+                best[0], best[1] = row[-1], list(self.values)
+            elif row[-1] == best[0]:
+                best[1].extend(self.values)
+        if min(row) <= best[0]:          # ainda dá para chegar a algo tão bom quanto o melhor
+            for next_char, child in self.children.items():
+                child._walk(next_char, word, row, best)
+
+
+_trie: _Trie | None = None
+
+
+def _load() -> _Trie:
+    global _trie
+    if _trie is None:
+        _trie = _Trie()
+        with GAZETTEER_FILE.open(encoding="utf-8") as fp:
+            for row in csv.DictReader(fp):
+                uf = row.get("uf") or IBGE_UF.get(row.get("codigo_uf", ""), "")
+                _trie.insert(normalize(row["nome"]), (uf, float(row["latitude"]), float(row["longitude"])))
+    return _trie
+
+
+def _max_edits(name: str) -> int:
+    return 0 if len(name) <= 4 else 1 if len(name) <= 8 else 2
+
+
+def split_uf(text: str) -> Tuple[str, str]:
+    """'Campinas/SP', 'Campinas - SP' → ('Campinas', 'SP'); 'SP' → ('', 'SP'); sem UF → (texto, '')."""
+    text = text.strip()
+    if text.upper() in UF_CENTROIDS:
+        return "", text.upper()
+    match = _WITH_UF.match(text)
+    if match and match.group(2).upper() in UF_CENTROIDS:
+        return match.group(1), match.group(2).upper()
+    return text, ""
+
+
+def uf_from_source(source: str) -> str:
+    match = _TJ_SOURCE.match(source)
+    if not match:
+        return ""
+    return "DF" if match.group(1) == "DFT" else match.group(1)
+
+
+@lru_cache(maxsize=65536)
+def locate(location: str, uf_hint: str = "") -> Tuple[float, float, str] | None:
+    """(lat, lon, geohash) de um texto de localização; None se nem a UF for reconhecida."""
+    text, uf = split_uf(location)
+    uf = uf or uf_hint
+
+    name = normalize(text)
+    if name:
+        _, candidates = _load().search(name, _max_edits(name))
+        if uf:
+            candidates = [c for c in candidates if c[0] == uf]
+        if len({(c[1], c[2]) for c in candidates}) == 1:
+            _, lat, lon = candidates[0]
+            return lat, lon, geohash(lat, lon, CITY_PRECISION)
+
+    if uf in UF_CENTROIDS:
+        lat, lon = UF_CENTROIDS[uf]
+        return lat, lon, geohash(lat, lon, UF_PRECISION)
+    return None
+
+
+# ---------- Agrupamento para o mapa ----------
+class ClusterIndex:
+    """
+    Acumula os lotes geocodificados e exporta, por nível de geohash, a contagem e
+    o centro de cada bloco, mais um arquivo de lotes por bloco de TILE_PRECISION:
+    o mapa carrega só os blocos visíveis na tela. Lotes só com a UF (geohash de
+    UF_PRECISION, mais curto que o bloco) vão para tiles/uf/<geohash>.json.
+    Cada bloco sai ordenado por (source, id), como os demais gravadores
+    canônicos: dados iguais geram arquivos iguais, seja qual for a chegada.
+
+    Memória: os blocos guardam um dicionário pequeno (source, id, lat, lon) por
+    lote geocodificado até o export, ou seja, cresce com o catálogo (da ordem de
+    200 bytes por lote) — bem menos que os registros completos.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, Dict[str, List[float]]] = {p: {} for p in CLUSTER_PRECISIONS}
+        self._tiles: Dict[str, List[dict]] = {}
+        self.missing: Counter = Counter()     # localizações não reconhecidas
+
+    def add(self, record: dict) -> None:
+        gh = record.get("geohash")
+        if not gh:
+            self.missing[record.get("location", "")] += 1
+            return
+        lat, lon = record["lat"], record["lon"]
+        for precision, buckets in self._buckets.items():
+            if len(gh) >= precision:
+                bucket = buckets.setdefault(gh[:precision], [0, 0.0, 0.0])
+                bucket[0] += 1
+                bucket[1] += lat
+                bucket[2] += lon
+        tile = gh[:TILE_PRECISION] if len(gh) >= TILE_PRECISION else f"uf/{gh}"
+        self._tiles.setdefault(tile, []).append(
+            {"source": record["source"], "id": record["id"], "lat": lat, "lon": lon})
+
+    def export(self, out_dir: Path) -> None:
+        clusters = {
+            str(precision): {gh: {"n": n, "lat": round(lat / n, 5), "lon": round(lon / n, 5)}
+                             for gh, (n, lat, lon) in sorted(buckets.items())}
+            for precision, buckets in self._buckets.items()
+        }
+        tiles_dir = out_dir / "tiles"
+        shutil.rmtree(tiles_dir, ignore_errors=True)      # blocos que esvaziaram somem
+        (tiles_dir / "uf").mkdir(parents=True)
+        (out_dir / "clusters.json").write_text(codec.dumps(clusters), encoding="utf-8")
+        for gh, lots in self._tiles.items():
+            lots.sort(key=lambda lot: (lot["source"], lot["id"]))
+            (tiles_dir / f"{gh}.json").write_text(codec.dumps(lots), encoding="utf-8")
+
+        logger.info("Mapa: %d blocos de lotes em %s", len(self._tiles), out_dir)
+        if self.missing:
+            top = ", ".join(f"{loc or '(vazio)'}={n}" for loc, n in self.missing.most_common(5))
+            logger.info("Sem geocodificação: %d lotes (mais frequentes: %s)", sum(self.missing.values()), top)
@@ -0,0 +1,82 @@
+"""
+Saúde das fontes entre execuções.
+Cada fonte guarda falhas consecutivas, último sucesso e a classe do último
+erro. Depois de QUARANTINE_AFTER falhas seguidas ela entra em quarentena: só
+roda como sonda (uma tentativa, sem retries, com PROBE_TIMEOUT) quando vence
+o próximo horário de sonda, que dobra a cada falha até PROBE_MAX_H. Um
+sucesso tira a fonte da quarentena.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Set, Tuple
+
+QUARANTINE_AFTER = 3       # falhas seguidas até a quarentena
+PROBE_BASE_H = 24.0        # primeira sonda um dia depois de entrar em quarentena
+PROBE_MAX_H = 30 * 24.0    # intervalo máximo entre sondas
+PROBE_TIMEOUT = 60         # segundos de uma sonda
+
+logger = logging.getLogger("health")
+
+
+def load(path: Path) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save(path: Path, state: Dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dict(sorted(state.items())), indent=2, ensure_ascii=False))
+
+
+def describe(exc: BaseException) -> str:
+    text = str(exc).splitlines()[0][:200] if str(exc) else ""
+    return f"{type(exc).__name__}: {text}" if text else type(exc).__name__
+
+
+def update(state: Dict[str, dict], outcomes: Dict[str, str | None], now: datetime) -> Dict[str, dict]:
+    """Aplica os resultados de uma execução: {fonte: None (sucesso) | descrição do erro}."""
+    merged = dict(state)
+    for name, error in outcomes.items():
+        entry = dict(merged.get(name) or {"failures": 0, "last_success": None})
+        if error is None:
+            entry.update(failures=0, last_success=now.isoformat(), error=None, next_probe=None)
+        else:
+            entry["failures"] += 1
+            entry.update(last_failure=now.isoformat(), error=error, next_probe=None)
+            if entry["failures"] >= QUARANTINE_AFTER:
+                hours = min(PROBE_BASE_H * 2 ** (entry["failures"] - QUARANTINE_AFTER), PROBE_MAX_H)
+                entry["next_probe"] = (now + timedelta(hours=hours)).isoformat()
+        merged[name] = entry
+    return merged
+
+
+def split(state: Dict[str, dict], names: Iterable[str], now: datetime) -> Tuple[Set[str], Set[str]]:
+    """(sondas, em quarentena fora da janela): as demais fontes rodam normalmente."""
+    probes, held = set(), set()
+    for name in names:
+        entry = state.get(name)
+        if not entry or entry["failures"] < QUARANTINE_AFTER:
+            continue
+        if entry["next_probe"] and now < datetime.fromisoformat(entry["next_probe"]):
+            held.add(name)
+        else:
+            probes.add(name)
+    return probes, held
+
+
+def report(state: Dict[str, dict]) -> None:
+    names = set(state)
+    failing = sorted(n for n in names if state.get(n, {}).get("failures"))
+    quarantined = [n for n in failing if state[n]["failures"] >= QUARANTINE_AFTER]
+    logger.info("Saúde das fontes: %d ok, %d falhando, %d em quarentena",
+                len(names) - len(failing), len(failing) - len(quarantined), len(quarantined))
+    for name in failing:
+        entry = state[name]
+        logger.warning("  %-36s falhas=%d último sucesso=%s próxima sonda=%s erro=%s", name,
+                       entry["failures"], (entry["last_success"] or "nunca")[:16],
+                       (entry.get("next_probe") or "-")[:16], entry["error"])
@@ -0,0 +1,166 @@
+"""
+Histórico de preços por lote (série temporal em SQLite).
+Cada execução só acrescenta uma observação quando o preço ou a data do lote
+mudou desde a última vista, então o arquivo cresce com as mudanças e não com
+execuções × catálogo. `latest` guarda o último estado de cada lote para a
+comparação; `observations` é só de acréscimo. Para comparar sem uma consulta
+por lote, `latest` é carregada inteira num dicionário na primeira gravação:
+a memória cresce com o catálogo (da ordem de 150 bytes por lote), assim como
+as observações pendentes até o commit, que só incluem os lotes que mudaram.
+O arquivo é binário e fica fora do git (data/history/ no .gitignore); no
+workflow ele persiste entre execuções pelo cache do Actions.
+
+Uso: python -m scraper.history drops --days 7 --pct 10
+     python -m scraper.history series TJSP 12345
+     python -m scraper.history compact
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger("history")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    source TEXT, id TEXT, observed_at TEXT, price_cents INTEGER, auction_date TEXT
+);
+CREATE INDEX IF NOT EXISTS observations_by_lot ON observations (source, id, observed_at);
+CREATE INDEX IF NOT EXISTS observations_by_time ON observations (observed_at);
+CREATE TABLE IF NOT EXISTS latest (
+    source TEXT, id TEXT, price_cents INTEGER, auction_date TEXT, PRIMARY KEY (source, id)
+) WITHOUT ROWID;
+"""
+
+# observações cujo preço caiu em relação à anterior do mesmo lote
+_DROPS = """
+SELECT source, id, observed_at, prev_price, price_cents, auction_date FROM (
+    SELECT source, id, observed_at, price_cents, auction_date,
+           LAG(price_cents) OVER (PARTITION BY source, id ORDER BY observed_at) AS prev_price
+    FROM observations
+    WHERE (source, id) IN (SELECT DISTINCT source, id FROM observations WHERE observed_at >= ?)
+)
+WHERE observed_at >= ? AND prev_price > 0 AND price_cents IS NOT NULL
+  AND price_cents <= prev_price * (1 - ? / 100.0)
+ORDER BY 1.0 * price_cents / prev_price, source, id
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class PriceHistory:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self._latest: Dict[Tuple[str, str], Tuple[int | None, str]] | None = None
+        self._pending: List[tuple] = []
+        self._observed_at = _now()
+
+    # ---------- Gravação incremental ----------
+    def add(self, record: dict) -> None:
+        """Enfileira a observação se o lote for novo ou tiver mudado de preço/data."""
+        if self._latest is None:
+            self._latest = {(s, i): (p, d) for s, i, p, d in self._db.execute("SELECT * FROM latest")}
+        key = (record["source"], record["id"])
+        state = (record.get("price_cents"), record["auction_date"])
+        if self._latest.get(key) != state:
+            self._latest[key] = state
+            self._pending.append((*key, self._observed_at, *state))
+
+    def commit(self) -> int:
+        with self._db:
+            self._db.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?)", self._pending)
+            self._db.executemany("INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?)",
+                                 [(s, i, p, d) for s, i, _, p, d in self._pending])
+        changed, self._pending = len(self._pending), []
+        logger.info("Histórico de preços: %d observações novas", changed)
+        return changed
+
+    # ---------- Consultas ----------
+    def drops(self, since: str, min_pct: float) -> List[dict]:
+        """Lotes cujo preço caiu pelo menos `min_pct`% numa observação desde `since`."""
+        rows = self._db.execute(_DROPS, (since, since, min_pct)).fetchall()
+        return [
+            {"source": s, "id": i, "observed_at": at, "before": before, "after": after,
+             "drop_pct": round(100 * (1 - after / before), 1), "auction_date": date}
+            for s, i, at, before, after, date in rows
+        ]
+
+    def series(self, source: str, lot_id: str) -> List[tuple]:
+        return self._db.execute(
+            "SELECT observed_at, price_cents, auction_date FROM observations "
+            "WHERE source = ? AND id = ? ORDER BY observed_at", (source, lot_id)).fetchall()
+
+    # ---------- Manutenção ----------
+    def compact(self) -> int:
+        """Remove observações iguais à anterior do mesmo lote, refaz `latest` e devolve o espaço."""
+        with self._db:
+            removed = self._db.execute("""
+                DELETE FROM observations WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, price_cents IS LAG(price_cents) OVER w
+                                  AND auction_date IS LAG(auction_date) OVER w AS same
+                        FROM observations
+                        WINDOW w AS (PARTITION BY source, id ORDER BY observed_at)
+                    ) WHERE same)
+            """).rowcount
+            self._db.execute("DELETE FROM latest")
+            self._db.execute("""
+                INSERT INTO latest
+                SELECT source, id, price_cents, auction_date FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY source, id ORDER BY observed_at DESC) AS n
+                    FROM observations) WHERE n = 1
+            """)
+        self._db.execute("VACUUM")
+        self._latest = None
+        logger.info("Compactação: %d observações redundantes removidas", removed)
+        return removed
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def _cents(value: int | None) -> str:
+    return "N/A" if value is None else f"R$ {value / 100:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(name)s | %(message)s")
+    parser = argparse.ArgumentParser(description="Histórico de preços dos lotes")
+    sub = parser.add_subparsers(dest="command", required=True)
+    drops = sub.add_parser("drops", help="lotes cujo preço caiu")
+    drops.add_argument("--days", type=float, default=7, help="janela em dias")
+    drops.add_argument("--pct", type=float, default=10, help="queda mínima em %%")
+    series = sub.add_parser("series", help="série de um lote")
+    series.add_argument("source")
+    series.add_argument("id")
+    sub.add_parser("compact", help="remove observações redundantes")
+    args = parser.parse_args()
+
+    from scraper.fetch_auctions import HISTORY_FILE
+
+    store = PriceHistory(HISTORY_FILE)
+    try:
+        if args.command == "drops":
+            since = (datetime.now(timezone.utc) - timedelta(days=args.days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            for d in store.drops(since, args.pct):
+                print(f"{d['observed_at'][:10]}  {d['source']:<14} {d['id']:<16} "
+                      f"{_cents(d['before']):>18} → {_cents(d['after']):>18}  -{d['drop_pct']}%")
+        elif args.command == "series":
+            for observed_at, price, date in store.series(args.source, args.id):
+                print(f"{observed_at}  {_cents(price):>18}  {date}")
+        else:
+            store.compact()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Camada HTTP compartilhada pelos plug‑ins.
+Centraliza retries, download de fotos, o circuit breaker por host,
+a negociação de compressão e a contabilidade de bytes por fonte.
+
+Dependências opcionais:
+* Brotli / backports.zstd – habilitam "br" e "zstd" no Accept-Encoding;
+* httpx[http2]            – habilita HTTP/2 para os hosts em HTTP2_HOSTS.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+from urllib.parse import urlsplit
+
+import aiohttp
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+try:
+    import httpx
+except ImportError:        # HTTP/2 é opcional
+    httpx = None
+
+# ---------- Configurações ----------
+BREAKER_THRESHOLD = 5      # falhas consecutivas que abrem o circuito de um host
+BREAKER_COOLDOWN = 120.0   # segundos com o circuito aberto antes de liberar uma sonda
+REQUEST_TIMEOUT = 60
+STREAM_CHUNK = 64 * 1024   # pedaço entregue por iter_chunks()
+POOL_SIZE = 100            # conexões simultâneas da sessão compartilhada (todas as fontes)
+HTTP2_HOSTS = {            # hosts com muitas páginas de detalhe/fotos: uma conexão multiplexada
+    "www.megaleiloes.com.br",
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; LeilaoBot/1.0; +https://seusite.com)"
+}
+
+logger = logging.getLogger("net")
+logging.getLogger("httpx").setLevel(logging.WARNING)   # uma linha por requisição é ruído
+
+# fonte em execução, definida pelo orquestrador para atribuir o tráfego
+current_source: ContextVar[str] = ContextVar("current_source", default="-")
+# fonte em quarentena rodando como sonda: uma tentativa só, sem retries
+probing: ContextVar[bool] = ContextVar("probing", default=False)
+
+
+# ---------- Compressão ----------
+def _has_module(*names: str) -> bool:
+    return any(importlib.util.find_spec(n) is not None for n in names)
+
+
+def _accept_encoding(brotli: bool, zstd: bool) -> str:
+    encodings = ["gzip", "deflate"]
+    if brotli:
+        encodings.append("br")
+    if zstd:
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+try:
+    from aiohttp import compression_utils as _aiohttp_codecs
+except ImportError:
+    _aiohttp_codecs = None
+
+# só anuncia o que o cliente consegue decodificar
+ACCEPT_ENCODING = _accept_encoding(
+    getattr(_aiohttp_codecs, "HAS_BROTLI", False),
+    getattr(_aiohttp_codecs, "HAS_ZSTD", False),
+)
+HTTPX_ACCEPT_ENCODING = _accept_encoding(
+    _has_module("brotli", "brotlicffi"),
+    _has_module("zstandard"),
+)
+
+
+# ---------- Contabilidade de tráfego ----------
+@dataclass
+class TransferStats:
+    requests: int = 0
+    wire_bytes: int = 0        # corpo como trafegou (comprimido)
+    decoded_bytes: int = 0     # corpo após descompressão
+    unsized: int = 0           # respostas sem Content-Length (contadas sem compressão)
+
+
+transfer_stats: Dict[str, TransferStats] = {}
+
+
+def _account(wire: int | None, decoded: int) -> None:
+    stats = transfer_stats.setdefault(current_source.get(), TransferStats())
+    stats.requests += 1
+    stats.decoded_bytes += decoded
+    if wire is None:
+        stats.unsized += 1
+        wire = decoded
+    stats.wire_bytes += wire
+
+
+def log_transfer_stats() -> None:
+    for source, st in sorted(transfer_stats.items()):
+        saving = 1 - st.wire_bytes / st.decoded_bytes if st.decoded_bytes else 0.0
+        logger.info("%-32s req=%d rede=%.1f KiB decodificado=%.1f KiB economia=%.0f%% sem-tamanho=%d",
+                    source, st.requests, st.wire_bytes / 1024, st.decoded_bytes / 1024,
+                    100 * saving, st.unsized)
+
+
+class CircuitOpenError(RuntimeError):
+    """O host está com o circuito aberto: a requisição nem chega a ser feita."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um host.
+    closed → open após `threshold` falhas seguidas; passado o `cooldown`
+    fica half‑open e libera uma única sonda, que fecha ou reabre o circuito.
+    """
+
+    def __init__(self, host: str, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(f"circuito aberto para {self.host}")
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("Circuito de %s fechado", self.host)
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning("Circuito de %s aberto após %d falhas", self.host, self.failures)
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Sonda interrompida sem resultado (ex.: cancelamento): libera nova tentativa."""
+        self._probing = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    host = urlsplit(url).netloc
+    if host not in _breakers:
+        _breakers[host] = CircuitBreaker(host)
+    return _breakers[host]
+
+
+def open_circuits() -> List[str]:
+    return sorted(h for h, b in _breakers.items() if b.state != "closed")
+
+
+def _status_of(exc: BaseException) -> int | None:
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status
+    if httpx is not None and isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    return None
+
+
+_TRANSPORT_ERRORS: tuple = (aiohttp.ClientError, asyncio.TimeoutError)
+if httpx is not None:
+    _TRANSPORT_ERRORS += (httpx.TransportError,)
+
+
+@asynccontextmanager
+async def _guarded(url: str):
+    breaker = breaker_for(url)
+    breaker.before_request()
+    try:
+        yield
+    except Exception as exc:
+        status = _status_of(exc)
+        if status is None and not isinstance(exc, _TRANSPORT_ERRORS):
+            breaker.release_probe()
+            raise
+        # 4xx significa que o host respondeu; só 5xx e erros de transporte contam como falha
+        if status is not None and status < 500:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        raise
+    except asyncio.CancelledError:
+        breaker.release_probe()
+        raise
+    else:
+        breaker.record_success()
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if probing.get():
+        return False
+    if isinstance(exc, (CircuitOpenError, asyncio.CancelledError)):
+        return False
+    status = _status_of(exc)
+    if status is not None:
+        return status >= 500 or status in (408, 429)
+    return True
+
+
+_retry = retry(
+    wait=wait_exponential(multiplier=1, min=2, max=30),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception(_is_retryable),
+    reraise=True,
+)
+
+
+# ---------- Transportes ----------
+_http2_client = None
+_session: aiohttp.ClientSession | None = None
+
+
+@asynccontextmanager
+async def session():
+    """
+    Sessão aiohttp compartilhada pelos plug‑ins: o pool de conexões (e o cache de
+    DNS) sobrevive entre fontes e, no modo daemon, entre execuções.
+    Sair do bloco não fecha a sessão; quem fecha é aclose().
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=POOL_SIZE, ttl_dns_cache=300))
+    yield _session
+
+
+def _use_http2(url: str) -> bool:
+    return httpx is not None and urlsplit(url).hostname in HTTP2_HOSTS and _has_module("h2")
+
+
+def _get_http2_client():
+    """Cliente httpx compartilhado: detalhes e fotos do mesmo host dividem uma conexão HTTP/2."""
+    global _http2_client
+    if _http2_client is None:
+        _http2_client = httpx.AsyncClient(http2=True, timeout=REQUEST_TIMEOUT, follow_redirects=True)
+    return _http2_client
+
+
+async def aclose() -> None:
+    """Fecha a sessão e o cliente HTTP/2 compartilhados (chamado pelo orquestrador ao final)."""
+    global _http2_client, _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+    if _http2_client is not None:
+        await _http2_client.aclose()
+        _http2_client = None
+
+
+async def _request(session: aiohttp.ClientSession, url: str, headers: dict, as_text: bool):
+    if _use_http2(url):
+        resp = await _get_http2_client().get(url, headers={**headers, "Accept-Encoding": HTTPX_ACCEPT_ENCODING})
+        resp.raise_for_status()
+        _account(resp.num_bytes_downloaded, len(resp.content))
+        return resp.text if as_text else resp.content
+
+    headers = {**headers, "Accept-Encoding": ACCEPT_ENCODING}
+    async with session.get(url, headers=headers, timeout=REQUEST_TIMEOUT) as resp:
+        resp.raise_for_status()
+        body = await resp.read()
+        _account(resp.content_length, len(body))
+        return await resp.text() if as_text else body
+
+
+@_retry
+async def get_text(session: aiohttp.ClientSession, url: str, headers: dict = HEADERS) -> str:
+    async with _guarded(url):
+        return await _request(session, url, headers, as_text=True)
+
+
+@_retry
+async def get_bytes(session: aiohttp.ClientSession, url: str, headers: dict = HEADERS) -> bytes:
+    """Corpo sem decodificar (XML com declaração de encoding própria, .gz)."""
+    async with _guarded(url):
+        return await _request(session, url, headers, as_text=False)
+
+
+@_retry
+async def _open_stream(session: aiohttp.ClientSession, url: str, headers: dict) -> aiohttp.ClientResponse:
+    async with _guarded(url):
+        resp = await session.get(url, headers={**headers, "Accept-Encoding": ACCEPT_ENCODING},
+                                 timeout=REQUEST_TIMEOUT)
+        try:
+            resp.raise_for_status()
+        except aiohttp.ClientResponseError:
+            resp.release()
+            raise
+        return resp
+
+
+async def iter_chunks(session: aiohttp.ClientSession, url: str, headers: dict = HEADERS,
+                      chunk_size: int = STREAM_CHUNK) -> AsyncIterator[bytes]:
+    """
+    Corpo em pedaços, conforme chega (retries só até os cabeçalhos). Quem para de
+    ler no meio (aclose) fecha a conexão e não baixa o resto. Sempre por aiohttp,
+    inclusive para hosts de HTTP2_HOSTS (o sitemap da Mega Leilões passa por
+    aqui): um único download em streaming não ganha com a multiplexação.
+    """
+    resp = await _open_stream(session, url, headers)
+    decoded, complete = 0, False
+    try:
+        async for chunk in resp.content.iter_chunked(chunk_size):
+            decoded += len(chunk)
+            yield chunk
+        complete = True
+    finally:
+        resp.close()
+        _account(resp.content_length if complete else None, decoded)
+
+
+def photo_path(url: str, photos_dir: Path) -> str:
+    """Caminho (relativo a data/) onde a foto de `url` é gravada; não depende do download."""
+    name = url.split("/")[-1].split("?")[0]
+    return str((photos_dir / name).relative_to(photos_dir.parent))
+
+
+@_retry
+async def download_photo(session: aiohttp.ClientSession, url: str, photos_dir: Path,
+                         headers: dict = HEADERS) -> str:
+    path = photo_path(url, photos_dir)
+    dest = photos_dir.parent / path
+    if dest.exists():
+        return path
+    async with _guarded(url):
+        content = await _request(session, url, headers, as_text=False)
+    await asyncio.to_thread(dest.write_bytes, content)    # disco fora do laço de eventos
+    return path
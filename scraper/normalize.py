@@ -0,0 +1,153 @@
+"""
+Normalização em lote de datas, preços e localizações.
+Os plug‑ins emitem os textos como aparecem no site; este estágio converte
+coluna a coluna: cada valor distinto do lote é convertido uma vez só, e os
+conversores são memoizados entre lotes (muitos lotes dividem a mesma data,
+o mesmo preço "N/A", a mesma comarca).
+
+* datas: dd/mm/aaaa, ISO‑8601 ou RFC 822 (RSS) → ISO‑8601 em UTC;
+* preços: "R$ 1.234,56" → 123456 centavos (Auction.price continua com o texto).
+  O separador decimal é o último entre "." e ",", desde que o outro agrupe
+  milhares ("1,234.56" também é 123456); valor ambíguo ("1,234") ou em outra
+  moeda ("US$ 1,234.56", "€ 10") é falha de normalização, não um preço errado;
+* localizações: "CAMPINAS - sp" → "Campinas/SP".
+"""
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
+
+from scraper import geo
+
+CACHE_SIZE = 65536         # valores distintos memoizados por conversor
+NO_PRICE = {"", "n/a", "-", "—", "consulte", "sob consulta"}   # ausência de preço, não erro
+REPORT_SAMPLES = 3         # exemplos por campo/fonte no relatório
+
+logger = logging.getLogger("normalize")
+
+_DMY = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_AMOUNT = r"(\d[\d.,]*)"
+_BRL_TAGGED = re.compile(r"R\$\s*" + _AMOUNT)      # valor dentro de um texto maior
+_BRL_BARE = re.compile(_AMOUNT)                    # campo só com o número
+_FOREIGN = re.compile(r"US\$|U\$S|€|£|\b(?:USD|EUR|GBP)\b|(?<!R)\$")   # preço em outra moeda
+_PARTICLES = {"de", "da", "do", "das", "dos", "e"}
+
+_failures: Counter = Counter()                 # (campo, fonte) -> linhas
+_samples: Dict[Tuple[str, str], Set[str]] = {}
+
+
+# ---------- Conversores (memoizados) ----------
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(text: str) -> str | None:
+    """ISO‑8601 em UTC; None se o texto não for uma data reconhecida."""
+    text = text.strip()
+    match = _DMY.search(text)
+    if match:
+        day, month, year = (int(g) for g in match.groups())
+        try:
+            return datetime(year, month, day, tzinfo=timezone.utc).isoformat()
+        except ValueError:
+            return None
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_price(text: str) -> Tuple[bool, int | None]:
+    """(ok, centavos). Textos de NO_PRICE dão (True, None); o que não for reconhecido, (False, None)."""
+    cleaned = text.replace("\xa0", " ").strip()
+    if cleaned.lower() in NO_PRICE:
+        return True, None
+    match = _BRL_TAGGED.search(cleaned) or (None if _FOREIGN.search(cleaned) else _BRL_BARE.fullmatch(cleaned))
+    cents = _cents(match.group(1).rstrip(".,")) if match else None    # "R$ 500." no fim da frase
+    return cents is not None, cents
+
+
+def _cents(amount: str) -> int | None:
+    """
+    Centavos de "1.234,56", "1,234.56", "1234.5" ou "250.000"; None se ambíguo.
+    Com um só tipo de separador, ele é decimal se vier uma vez seguido de 1–2
+    dígitos; "." seguido de grupos de 3 dígitos é milhar (padrão brasileiro);
+    "," seguido de 3 dígitos pode ser milhar em inglês ou decimal, e é rejeitado.
+    """
+    last = max(amount.rfind("."), amount.rfind(","))
+    if last < 0:
+        return int(amount) * 100
+    mark, integer, fraction = amount[last], amount[:last], amount[last + 1:]
+    if mark in integer or len(fraction) > 2:        # sem decimal: só "." agrupando milhares
+        integer, fraction, grouping = amount, "", "."
+    else:
+        grouping = "," if mark == "." else "."
+    if not re.fullmatch(r"\d{1,3}(?:%s\d{3})*|\d+" % re.escape(grouping), integer):
+        return None
+    return int(integer.replace(grouping, "")) * 100 + int(fraction.ljust(2, "0"))
+
+
+def _title(word: str) -> str:
+    return "-".join(part[:1].upper() + part[1:].lower() for part in word.split("-"))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_location(text: str) -> str:
+    city, uf = geo.split_uf(" ".join(text.split()))
+    words = city.split()
+    city = " ".join(w.lower() if i and w.lower() in _PARTICLES else _title(w) for i, w in enumerate(words))
+    if city and uf:
+        return f"{city}/{uf}"
+    return city or uf
+
+
+# ---------- Estágio ----------
+def _fail(field: str, source: str, value: str) -> None:
+    _failures[field, source] += 1
+    samples = _samples.setdefault((field, source), set())
+    if len(samples) < REPORT_SAMPLES:
+        samples.add(value)
+
+
+def normalize_batch(lots: List) -> List:
+    """
+    Normaliza um lote de Auction coluna a coluna. Data não reconhecida fica com o
+    texto original (o filtro mantém lotes sem data válida) e entra no relatório.
+    """
+    dates = {text: parse_date(text) for text in {lot.auction_date for lot in lots}}
+    prices = {text: parse_price(text) for text in {lot.price for lot in lots}}
+    places = {text: canonical_location(text) for text in {lot.location for lot in lots}}
+
+    out = []
+    for lot in lots:
+        iso = dates[lot.auction_date]
+        if iso is None:
+            _fail("auction_date", lot.source, lot.auction_date)
+        ok, cents = prices[lot.price]
+        if not ok:
+            _fail("price", lot.source, lot.price)
+        out.append(replace(lot, auction_date=iso or lot.auction_date, price_cents=cents,
+                           location=places[lot.location]))
+    return out
+
+
+def reset() -> None:
+    _failures.clear()
+    _samples.clear()
+
+
+def report() -> None:
+    """Loga as linhas que não puderam ser normalizadas, por campo e fonte."""
+    for (field, source), count in sorted(_failures.items()):
+        examples = ", ".join(repr(v) for v in sorted(_samples[field, source]))
+        logger.warning("%s: %d valores de %s não normalizados (ex.: %s)", source, count, field, examples)
@@ -0,0 +1,104 @@
+"""
+Fase de fotos, adiada para depois da gravação dos lotes.
+Os plug‑ins só registram a URL da foto (o caminho final é determinístico);
+o orquestrador baixa tudo no fim da execução, cada foto isolada das demais,
+e as que falharem ficam numa fila persistida para a próxima execução.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import aiohttp
+
+from scraper import net
+
+CONCURRENCY = 10           # downloads de fotos simultâneos
+MAX_ATTEMPTS = 5           # execuções seguidas tentando a mesma foto antes de desistir
+
+logger = logging.getLogger("photos")
+
+_pending: Dict[str, dict] = {}     # url -> tarefa registrada nesta execução
+_origins: Dict[str, str] = {}      # caminho -> url, das fotos vistas nesta execução
+
+
+def defer(url: str, photos_dir: Path) -> str:
+    """Registra a foto para a fase de fotos e devolve o caminho que ela terá."""
+    path = net.photo_path(url, photos_dir)
+    _origins[path] = url
+    if url not in _pending and not (photos_dir.parent / path).exists():
+        _pending[url] = {"url": url, "dir": str(photos_dir), "source": net.current_source.get(),
+                         "attempts": 0}
+    return path
+
+
+def origins(lots: Iterable) -> Dict[str, str]:
+    """URL de origem das fotos destes lotes, para gravar junto com eles no cache."""
+    return {lot.photo_path: _origins[lot.photo_path] for lot in lots if lot.photo_path in _origins}
+
+
+def load_queue(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_queue(path: Path, jobs: List[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(jobs, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+async def download_all(queue_file: Path, timeout: float) -> Tuple[int, int]:
+    """
+    Baixa as fotos registradas nesta execução mais as que estavam na fila.
+    Devolve (baixadas, na fila); o que falhar ou não couber em `timeout` volta para a fila.
+    """
+    jobs: Dict[str, dict] = {job["url"]: job for job in load_queue(queue_file)}
+    for url, job in _pending.items():
+        jobs.setdefault(url, job)
+    _pending.clear()
+    _origins.clear()
+    if not jobs:
+        return 0, 0
+
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def _one(session: aiohttp.ClientSession, job: dict) -> None:
+        async with sem:
+            token = net.current_source.set(job["source"])
+            try:
+                await net.download_photo(session, job["url"], Path(job["dir"]))
+            finally:
+                net.current_source.reset(token)
+
+    async with net.session() as session:
+        tasks = {asyncio.create_task(_one(session, job), name=f"{job['source']} (fotos)"): job
+                 for job in jobs.values()}
+        done, unfinished = await asyncio.wait(tasks, timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+
+    queue: List[dict] = [tasks[t] for t in unfinished]
+    dropped = 0
+    for task in done:
+        if task.exception() is None:
+            continue
+        job = tasks[task]
+        job["attempts"] += 1
+        logger.debug("Foto %s falhou (%d/%d): %s", job["url"], job["attempts"], MAX_ATTEMPTS, task.exception())
+        if job["attempts"] < MAX_ATTEMPTS:
+            queue.append(job)
+        else:
+            dropped += 1
+    save_queue(queue_file, sorted(queue, key=lambda j: j["url"]))
+
+    downloaded = len(done) - (len(queue) - len(unfinished)) - dropped
+    logger.info("Fotos: %d baixadas, %d na fila para a próxima execução, %d descartadas",
+                downloaded, len(queue), dropped)
+    if unfinished:
+        logger.warning("Prazo da fase de fotos esgotado com %d fotos pendentes", len(unfinished))
+    return downloaded, len(queue)
@@ -0,0 +1,140 @@
+"""
+Pipeline em estágios ligados por filas asyncio limitadas.
+Cada estágio tem seu próprio número de workers; fila cheia segura o estágio
+anterior (backpressure), então a memória fica limitada pelo tamanho das filas.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, List, Tuple
+
+QUEUE_SIZE = 256           # itens por fila entre estágios
+
+logger = logging.getLogger("pipeline")
+
+_DONE = object()           # sentinela de fim de fluxo
+
+
+@dataclass
+class StageStats:
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy: float = 0.0          # segundos processando itens
+    blocked: float = 0.0       # segundos esperando vaga na fila seguinte
+
+
+class Stage:
+    """
+    Estágio do pipeline. `func(item)` pode ser síncrona ou assíncrona;
+    retornar None descarta o item.
+    Com `batch > 1`, `func` recebe a lista de itens já enfileirados (até `batch`,
+    sem esperar a fila encher) e devolve a lista de resultados.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, maxsize: int = QUEUE_SIZE,
+                 batch: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch = batch
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.stats = StageStats()
+
+
+async def _take(stage: Stage) -> Tuple[list, bool]:
+    """Até `stage.batch` itens da fila (espera só pelo primeiro); True se veio a sentinela."""
+    items = [await stage.queue.get()]
+    while items[-1] is not _DONE and len(items) < stage.batch and not stage.queue.empty():
+        items.append(stage.queue.get_nowait())
+    if items[-1] is _DONE:          # cada worker consome exatamente uma sentinela
+        items.pop()
+        return items, True
+    return items, False
+
+
+async def _forward(stage: Stage, nxt: Stage | None, results: Iterable) -> None:
+    """Passa os resultados (menos os None, descartados) ao próximo estágio."""
+    for out in results:
+        if out is None:
+            continue
+        stage.stats.items_out += 1
+        if nxt is not None:
+            t0 = time.perf_counter()
+            await nxt.queue.put(out)
+            stage.stats.blocked += time.perf_counter() - t0
+
+
+class Pipeline:
+    """Encadeia estágios; quem produz chama `put()` para alimentar o primeiro."""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        self.source_stats = StageStats()
+        self.wall = 0.0
+
+    async def put(self, item: Any) -> None:
+        t0 = time.perf_counter()
+        await self.stages[0].queue.put(item)
+        self.source_stats.blocked += time.perf_counter() - t0
+        self.source_stats.items_out += 1
+
+    async def run(self, producer: Callable[["Pipeline"], Awaitable[None]]) -> None:
+        t0 = time.perf_counter()
+        workers = [
+            [asyncio.create_task(self._worker(i)) for _ in range(stage.workers)]
+            for i, stage in enumerate(self.stages)
+        ]
+        try:
+            await producer(self)
+            # encerra estágio por estágio, na ordem, para não perder itens em trânsito
+            for stage, tasks in zip(self.stages, workers):
+                for _ in tasks:
+                    await stage.queue.put(_DONE)
+                await asyncio.gather(*tasks)
+        finally:
+            for tasks in workers:
+                for task in tasks:
+                    task.cancel()
+            self.wall = time.perf_counter() - t0
+
+    async def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        nxt = self.stages[index + 1] if index + 1 < len(self.stages) else None
+
+        done = False
+        while not done:
+            items, done = await _take(stage)
+            if not items:
+                continue
+            stage.stats.items_in += len(items)
+
+            t0 = time.perf_counter()
+            try:
+                result = stage.func(items if stage.batch > 1 else items[0])
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as exc:
+                stage.stats.errors += len(items)
+                logger.warning("Estágio %s descartou %d item(ns): %s", stage.name, len(items), exc)
+                continue
+            finally:
+                stage.stats.busy += time.perf_counter() - t0
+            await _forward(stage, nxt, result if stage.batch > 1 else (result,))
+
+    def report(self) -> None:
+        """Loga a utilização de cada estágio; o de maior utilização é o gargalo."""
+        wall = self.wall or 1e-9
+        logger.info("Pipeline concluído em %.1fs (fontes emitiram %d itens, %.1fs bloqueadas)",
+                    self.wall, self.source_stats.items_out, self.source_stats.blocked)
+        for stage in self.stages:
+            s = stage.stats
+            logger.info(
+                "  %-15s workers=%d entrada=%d saída=%d erros=%d utilização=%5.1f%% bloqueado=%.1fs",
+                stage.name, stage.workers, s.items_in, s.items_out, s.errors,
+                100 * s.busy / (wall * stage.workers), s.blocked,
+            )
@@ -0,0 +1,188 @@
+"""
+Modo `--profile` do fetch_auctions.
+* Amostrador: uma thread lê a pilha de todas as threads a cada SAMPLE_INTERVAL
+  e atribui a amostra à fonte cujo módulo aparece nela (plug‑in em
+  scraper/sources/ ou scraper de scripts/core) ou, na falta, ao nome da task
+  em execução no laço (o orquestrador nomeia as tasks de cada fonte e das
+  fotos); o resto é do orquestrador.
+  Com as fontes intercaladas no mesmo laço, o cProfile não separa quem gastou
+  o quê; a amostragem separa. Saída por fonte em PROFILE_DIR:
+  <fonte>.folded (pilhas dobradas: flamegraph.pl, speedscope, inferno) e
+  <fonte>.txt (funções com mais amostras próprias e acumuladas).
+* Monitor de lag: o laço marca um batimento a cada LAG_INTERVAL; se a marca
+  atrasa mais que LAG_THRESHOLD, a thread de vigia captura a pilha do laço
+  naquele instante (é o callback que o está bloqueando) e loga com a fonte.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures.thread
+import logging
+import re
+import selectors
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Awaitable, Dict, List, Tuple, TypeVar
+
+SAMPLE_INTERVAL = 0.005    # segundos entre amostras
+MAX_DEPTH = 64             # quadros por pilha
+LAG_INTERVAL = 0.02        # batimento do laço
+LAG_THRESHOLD = 0.1        # bloqueio mínimo logado (segundos)
+TOP_FUNCTIONS = 25         # linhas por relatório de fonte
+
+logger = logging.getLogger("profiling")
+
+_SOURCE_MODULES = ("scraper.sources.", "scripts.")
+_ORCHESTRATOR = "(orquestrador)"
+# quadro mais interno de uma thread ociosa: laço no select, worker do pool esperando tarefa, espera em lock;
+# pelo código e não pelo nome, para não descartar funções homônimas (Pipeline._worker, por exemplo)
+_IDLE_CODE = {
+    threading.Condition.wait.__code__,
+    concurrent.futures.thread._worker.__code__,
+    *(cls.select.__code__ for name in ("SelectSelector", "PollSelector", "EpollSelector", "DevpollSelector",
+                                       "KqueueSelector") if (cls := getattr(selectors, name, None))),
+}
+
+T = TypeVar("T")
+
+
+def _frames(frame) -> List:
+    stack = []
+    while frame is not None and len(stack) < MAX_DEPTH:
+        stack.append(frame)
+        frame = frame.f_back
+    return stack                     # do mais interno para o mais externo
+
+
+def _source_of(stack: List, task: asyncio.Task | None = None) -> str:
+    for frame in stack:
+        name = frame.f_globals.get("__name__", "")
+        if name.startswith(_SOURCE_MODULES):
+            return name
+    if task is not None and not task.get_name().startswith("Task-"):
+        return task.get_name()
+    return _ORCHESTRATOR
+
+
+def _running_task(loop: asyncio.AbstractEventLoop) -> asyncio.Task | None:
+    """Task em execução no laço, lida de outra thread (só leitura, melhor esforço)."""
+    return asyncio.tasks._current_tasks.get(loop)
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{code.co_firstlineno}"
+
+
+class Sampler(threading.Thread):
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__(name="profiler", daemon=True)
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self.samples: Dict[str, Counter] = {}     # fonte -> pilha dobrada -> amostras
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        skip = {threading.get_ident()}
+        while not self._done.wait(SAMPLE_INTERVAL):
+            for ident, frame in sys._current_frames().items():
+                if ident in skip:
+                    continue
+                stack = _frames(frame)
+                if not stack or stack[0].f_code in _IDLE_CODE:
+                    continue                 # thread ociosa: não é custo de ninguém
+                folded = ";".join(_label(f) for f in reversed(stack))
+                task = _running_task(self._loop) if ident == self._loop_thread else None
+                self.samples.setdefault(_source_of(stack, task), Counter())[folded] += 1
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+    def write(self, out_dir: Path) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        totals = []
+        for source, stacks in sorted(self.samples.items()):
+            stem = re.sub(r"[^\w.-]+", "_", source)
+            (out_dir / f"{stem}.folded").write_text(
+                "".join(f"{stack} {n}\n" for stack, n in stacks.most_common()), encoding="utf-8")
+            own, total = Counter(), Counter()
+            for stack, n in stacks.items():
+                frames = stack.split(";")
+                own[frames[-1]] += n
+                for label in set(frames):
+                    total[label] += n
+            lines = [f"{source}: {sum(stacks.values())} amostras de {SAMPLE_INTERVAL * 1000:.0f} ms", "",
+                     f"{'próprias':>9} {'acumuladas':>11}  função"]
+            for label, n in own.most_common(TOP_FUNCTIONS):
+                lines.append(f"{n:>9} {total[label]:>11}  {label}")
+            (out_dir / f"{stem}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            totals.append((sum(stacks.values()) * SAMPLE_INTERVAL, source))
+        for seconds, source in sorted(totals, reverse=True):
+            logger.info("  %-40s ≈%.1fs de CPU/espera ativa", source, seconds)
+        logger.info("Perfis por fonte em %s", out_dir)
+
+
+class LagMonitor:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, name="lag-monitor", daemon=True)
+        self._task: asyncio.Task | None = None
+        self.events: List[Tuple[str, float]] = []
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(LAG_INTERVAL)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(LAG_INTERVAL):
+            beat = self._beat
+            lag = time.monotonic() - beat - LAG_INTERVAL
+            if lag < LAG_THRESHOLD or reported == beat:
+                continue
+            reported = beat                  # um aviso por bloqueio
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = _frames(frame) if frame is not None else []
+            source = _source_of(stack, _running_task(self._loop))
+            self.events.append((source, lag))
+            where = "\n".join(f"    {f.f_code.co_filename}:{f.f_lineno} {f.f_code.co_name}" for f in stack[:12])
+            logger.warning("Laço bloqueado há %.0f ms por %s:\n%s", lag * 1000, source, where)
+
+    def start(self) -> None:
+        self._task = self._loop.create_task(self._heartbeat())
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._watchdog.join()
+        if self.events:
+            worst = Counter()
+            for source, _ in self.events:
+                worst[source] += 1
+            logger.warning("Bloqueios do laço acima de %.0f ms: %s", LAG_THRESHOLD * 1000,
+                           ", ".join(f"{s}={n}" for s, n in worst.most_common()))
+
+
+async def run(coro: Awaitable[T], out_dir: Path) -> T:
+    """Executa `coro` com o amostrador e o monitor de lag ligados e grava os perfis."""
+    loop = asyncio.get_running_loop()
+    sampler = Sampler(loop)
+    monitor = LagMonitor(loop)
+    sampler.start()
+    monitor.start()
+    try:
+        return await coro
+    finally:
+        await monitor.stop()
+        sampler.stop()
+        sampler.write(out_dir)
@@ -0,0 +1,106 @@
+"""
+Agenda adaptativa das fontes (`--scheduled`).
+A cada execução, cada fonte concluída informa uma impressão digital dos lotes
+emitidos e quantas requisições gastou. Daí sai a taxa de mudança λ da fonte
+(estimador de Cho & Garcia‑Molina sobre verificações com e sem mudança, com
+decaimento para acompanhar fontes que mudam de ritmo) e a frequência de
+atualização f ∝ √(λ / custo), escalada para caber em DAILY_REQUEST_BUDGET.
+Fontes paradas há semanas caem para MAX_INTERVAL_H; as agitadas sobem até
+MIN_INTERVAL_H.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Set
+
+DAILY_REQUEST_BUDGET = 20_000   # requisições por dia somando todas as fontes
+MIN_INTERVAL_H = 1.0            # fonte mais agitada: no máximo uma vez por hora
+MAX_INTERVAL_H = 14 * 24.0      # fonte parada: ao menos uma vez a cada 14 dias
+TOLERANCE_H = 0.5               # antecipa um pouco para não perder a janela do cron
+DECAY = 0.9                     # peso do histórico a cada nova verificação
+PRIOR = {"checks": 1.0, "unchanged": 0.5, "hours": 24.0}   # fonte nova: ~1 mudança a cada 2‑3 dias
+
+logger = logging.getLogger("scheduler")
+
+
+def load_state(path: Path) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_state(path: Path, state: Dict[str, dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(dict(sorted(state.items())), indent=2, ensure_ascii=False))
+
+
+def _hours(since: str, now: datetime) -> float:
+    return max((now - datetime.fromisoformat(since)).total_seconds() / 3600, 0.0)
+
+
+def observe(state: Dict[str, dict], observations: Dict[str, dict], now: datetime) -> Dict[str, dict]:
+    """
+    Incorpora as observações de uma execução: {fonte: {"hash", "requests", "labels"}}.
+    Só entram fontes que terminaram; as que falharam continuam vencidas.
+    """
+    merged = dict(state)
+    for name, obs in observations.items():
+        entry = dict(merged.get(name) or {**PRIOR, "requests": float(obs["requests"])})
+        if "last_run" in entry:
+            changed = obs["hash"] != entry["hash"]
+            entry["checks"] = entry["checks"] * DECAY + 1
+            entry["unchanged"] = entry["unchanged"] * DECAY + (not changed)
+            entry["hours"] = entry["hours"] * DECAY + _hours(entry["last_run"], now)
+            entry["requests"] = 0.5 * obs["requests"] + 0.5 * entry["requests"]
+        entry.update(last_run=now.isoformat(), hash=obs["hash"], labels=sorted(obs["labels"]))
+        merged[name] = entry
+    return merged
+
+
+def change_rate(entry: dict) -> float:
+    """Mudanças por hora; o +0,5 evita λ infinito quando toda verificação viu mudança."""
+    mean_interval = entry["hours"] / entry["checks"]
+    if mean_interval <= 0:
+        return 1 / MIN_INTERVAL_H
+    return -math.log((entry["unchanged"] + 0.5) / (entry["checks"] + 0.5)) / mean_interval
+
+
+def intervals(state: Dict[str, dict], budget: float = DAILY_REQUEST_BUDGET) -> Dict[str, float]:
+    """Intervalo de atualização (horas) de cada fonte, cabendo no orçamento diário."""
+    rate = {n: max(change_rate(e), 1e-6) for n, e in state.items()}
+    cost = {n: max(e["requests"], 1.0) for n, e in state.items()}
+    per_hour = budget / 24
+    freq: Dict[str, float] = {}
+    active = set(state)
+    while active:
+        left = per_hour - sum(freq[n] * cost[n] for n in freq)
+        scale = max(left, 0.0) / sum(math.sqrt(rate[n] * cost[n]) for n in active)
+        clamped = False
+        for n in sorted(active):
+            f = scale * math.sqrt(rate[n] / cost[n])
+            if f >= 1 / MIN_INTERVAL_H or f <= 1 / MAX_INTERVAL_H:
+                freq[n] = min(max(f, 1 / MAX_INTERVAL_H), 1 / MIN_INTERVAL_H)
+                active.discard(n)
+                clamped = True
+        if not clamped:                  # ninguém bateu nos limites: distribuição final
+            freq.update({n: scale * math.sqrt(rate[n] / cost[n]) for n in active})
+            break
+    return {n: 1 / f for n, f in freq.items()}
+
+
+def due(state: Dict[str, dict], names: Iterable[str], now: datetime,
+        budget: float = DAILY_REQUEST_BUDGET) -> Set[str]:
+    """Fontes vencidas; as que nunca rodaram sempre estão."""
+    names = list(names)
+    known = {n: state[n] for n in names if n in state}
+    every = intervals(known, budget) if known else {}
+    selected = {n for n in names if n not in known
+                or _hours(known[n]["last_run"], now) + TOLERANCE_H >= every[n]}
+    spent = sum(known[n]["requests"] * 24 / every[n] for n in known)
+    logger.debug("Agenda: %d de %d fontes vencidas (≈%.0f req/dia previstas, orçamento %d)",
+                 len(selected), len(names), spent, budget)
+    return selected
@@ -0,0 +1,67 @@
+"""
+Divisão determinística das fontes entre shards (`--shard i/N`).
+Usa o custo histórico de cada fonte (segundos, média móvel) para equilibrar
+a carga: mesma lista de fontes + mesmo arquivo de custos = mesma divisão.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_COST = 30.0        # segundos assumidos para fonte sem histórico
+COST_SMOOTHING = 0.5       # peso da execução mais recente na média móvel
+
+logger = logging.getLogger("sharding")
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'2/4' → (2, 4); shards numerados de 0 a N-1."""
+    try:
+        index, total = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard inválido: {spec!r} (use i/N)") from None
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"shard inválido: {spec!r} (0 <= i < N)")
+    return index, total
+
+
+def load_costs(path: Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_costs(path: Path, costs: Dict[str, float]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rounded = {name: round(seconds, 1) for name, seconds in sorted(costs.items())}
+    path.write_text(json.dumps(rounded, indent=2))
+
+
+def update_costs(history: Dict[str, float], observed: Dict[str, float]) -> Dict[str, float]:
+    merged = dict(history)
+    for name, seconds in observed.items():
+        previous = history.get(name)
+        merged[name] = seconds if previous is None else \
+            COST_SMOOTHING * seconds + (1 - COST_SMOOTHING) * previous
+    return merged
+
+
+def assign(names: Iterable[str], total: int, costs: Dict[str, float]) -> List[List[str]]:
+    """
+    Longest‑processing‑time: fontes em ordem decrescente de custo vão para o
+    shard menos carregado. Empates são desfeitos por nome e índice do shard.
+    """
+    known = [c for c in costs.values() if c > 0]
+    fallback = sorted(known)[len(known) // 2] if known else DEFAULT_COST
+    shards: List[List[str]] = [[] for _ in range(total)]
+    loads = [0.0] * total
+
+    for name in sorted(names, key=lambda n: (-costs.get(n, fallback), n)):
+        target = min(range(total), key=lambda i: (loads[i], i))
+        shards[target].append(name)
+        loads[target] += costs.get(name, fallback)
+
+    logger.info("Carga estimada por shard: %s", ", ".join(f"{load:.0f}s" for load in loads))
+    return shards
@@ -0,0 +1,161 @@
+"""
+Descoberta de lotes pelo sitemap.xml do leiloeiro.
+O XML (e os sitemaps filhos de um índice) chega em pedaços por net.iter_chunks
+e vai direto a um parser incremental: cada <url> é entregue assim que fecha e
+descartado em seguida, sem o documento inteiro na memória. As páginas de detalhe
+são buscadas em paralelo, no máximo HOST_CONCURRENCY por host.
+Com `lastmod`, lote sem mudança sai do LotCache mesmo vencido e só os novos
+ou alterados vão ao parser de detalhe; sem `lastmod`, vale o TTL do cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import zlib
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import urlsplit
+from xml.etree.ElementTree import XMLPullParser
+
+import aiohttp
+
+from scraper import net
+from scraper.fetch_auctions import Auction, LotCache, row_failed
+
+CHUNK = 64 * 1024          # bytes entregues ao parser por vez
+MAX_DEPTH = 3              # índice → sitemap → (índice aninhado)
+HOST_CONCURRENCY = 8       # páginas de detalhe simultâneas por host
+
+logger = logging.getLogger("sitemap")
+
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+_limits_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class _Reader:
+    """
+    Parser incremental de sitemap: recebe o corpo em pedaços e devolve (tipo, loc,
+    lastmod) de cada <url> ou <sitemap> assim que fecha. Corpo .gz servido sem
+    Content-Encoding é descomprimido em streaming.
+    """
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._head = b""                 # bytes iniciais, até saber se é gzip
+        self._gunzip = None
+        self._sniffed = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, str, str | None]]:
+        if not self._sniffed:
+            self._head += chunk
+            if len(self._head) < 2:
+                return []
+            chunk, self._head, self._sniffed = self._head, b"", True
+            if chunk[:2] == b"\x1f\x8b":
+                self._gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._gunzip is not None:
+            chunk = self._gunzip.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._entries()
+
+    def close(self) -> List[Tuple[str, str, str | None]]:
+        if self._head:                   # corpo com menos de 2 bytes
+            self._parser.feed(self._head)
+        elif self._gunzip is not None:
+            self._parser.feed(self._gunzip.flush())
+        entries = self._entries()
+        self._parser.close()
+        return entries
+
+    def _entries(self) -> List[Tuple[str, str, str | None]]:
+        entries = []
+        for event, elem in self._parser.read_events():
+            if self._root is None:
+                self._root = elem
+            if event != "end" or _local(elem.tag) not in ("url", "sitemap"):
+                continue
+            fields = {_local(child.tag): (child.text or "").strip() for child in elem}
+            if fields.get("loc"):
+                entries.append((_local(elem.tag), fields["loc"], fields.get("lastmod") or None))
+            self._root.clear()           # libera os <url> já processados
+        return entries
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    """Semáforo do host de `url`: limita os detalhes simultâneos por leiloeiro."""
+    global _limits_loop
+    loop = asyncio.get_running_loop()
+    if _limits_loop is not loop:         # semáforos ficam presos ao loop em que foram usados
+        _host_limits.clear()
+        _limits_loop = loop
+    host = urlsplit(url).hostname or ""
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(HOST_CONCURRENCY)
+    return _host_limits[host]
+
+
+async def urls(session: aiohttp.ClientSession, url: str, headers: dict,
+               depth: int = 0) -> AsyncIterator[Tuple[str, str | None]]:
+    """(loc, lastmod) de todas as páginas do sitemap, seguindo índices."""
+    children: List[str] = []
+    reader = _Reader()
+
+    def _route(entries):
+        for kind, loc, lastmod in entries:
+            if kind == "sitemap":
+                children.append(loc)
+            else:
+                yield loc, lastmod
+
+    async for chunk in net.iter_chunks(session, url, headers, CHUNK):
+        for entry in _route(reader.feed(chunk)):
+            yield entry
+    for entry in _route(reader.close()):
+        yield entry
+
+    for child in children:
+        if depth >= MAX_DEPTH:
+            logger.warning("Sitemap %s ignorado: índice aninhado além de %d níveis", child, MAX_DEPTH)
+            continue
+        async for entry in urls(session, child, headers, depth + 1):
+            yield entry
+
+
+async def crawl(session: aiohttp.ClientSession, sitemap_url: str, headers: dict, pattern: re.Pattern,
+                cache: LotCache, parse_detail: Callable[[str], Awaitable[Auction | None]],
+                ttl: Callable[[Auction], float]) -> AsyncIterator[Auction]:
+    """
+    Emite todos os lotes do sitemap cujo endereço casa com `pattern`: os sem
+    mudança direto do cache, os demais por `parse_detail(url)`.
+    """
+    pending: List[Tuple[str, str | None]] = []
+    total = 0
+    async for loc, lastmod in urls(session, sitemap_url, headers):
+        if not pattern.search(loc):
+            continue
+        total += 1
+        lot = cache.get(loc, allow_expired=lastmod is not None, tag=lastmod or "")
+        if lot is None:
+            pending.append((loc, lastmod))
+        else:
+            yield lot
+    logger.info("%s: %d lotes no sitemap, %d novos ou alterados", sitemap_url, total, len(pending))
+
+    async def _detail(loc: str, lastmod: str | None):
+        async with _host_limit(loc):
+            return await parse_detail(loc), lastmod
+
+    for coro in asyncio.as_completed([_detail(loc, lastmod) for loc, lastmod in pending]):
+        try:
+            lot, lastmod = await coro
+        except Exception as exc:       # um lote com erro não derruba os demais
+            row_failed(exc)
+            continue
+        if lot:
+            cache.put(lot, ttl(lot), tag=lastmod or "")
+            yield lot
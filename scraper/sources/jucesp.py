@@ -4,65 +4,45 @@ Busca avisos de leilão publicados no Diário Oficial Empresarial.
 """
 from __future__ import annotations
 
-import asyncio
 import re
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
-
-import aiohttp
-from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import AsyncIterator, Dict
 
+from scraper import feeds
 from scraper.fetch_auctions import Auction
 
 BASE_URL = "https://www.jucesponline.sp.gov.br"
 RSS_URL = f"{BASE_URL}/rss/diarioempresarial.xml"   # feed oficial
 
+PARSER_VERSION = 3          # incremente ao mudar o parse: invalida o estado do feed
+PARSE_BUDGET = {"ms": 150, "kib": 8 * 1024}   # por 1.000 linhas, com folga sobre o medido nas fixtures
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; LeilaoBot/1.0; +https://seusite.com)"
 }
 
 
-@retry(wait=wait_exponential(multiplier=1, min=2, max=30), stop=stop_after_attempt(5))
-async def _get(session: aiohttp.ClientSession, url: str) -> str:
-    async with session.get(url, headers=HEADERS, timeout=60) as resp:
-        resp.raise_for_status()
-        return await resp.text()
-
-
-async def fetch(photos_dir: Path) -> List[Auction]:
-    auctions: List[Auction] = []
-    async with aiohttp.ClientSession() as session:
-        xml = await _get(session, RSS_URL)
-        soup = BeautifulSoup(xml, "xml")
-
-        for item in soup.find_all("item"):
-            title = item.title.get_text(strip=True)
+def _to_lot(item: Dict[str, str]) -> Auction:
+    title = item["title"]
+    link = item["link"]
 
-            # filtra textos que contenham a palavra leilão
-            if "leil" not in title.lower():
-                continue
+    # tenta capturar valor
+    price_match = re.search(r"R\$ ?[\d\.]+,\d{2}", title)
+    price = price_match.group() if price_match else "N/A"
 
-            link = item.link.get_text(strip=True)
-            pub_date = item.pubDate.get_text(strip=True)
-            date_iso = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %z") \
-                .astimezone(timezone.utc).isoformat()
+    return Auction(
+        source="JUCESP",
+        id=link.split("/")[-1],
+        title=title,
+        auction_date=item["date"],   # pubDate do feed (normalizado no pipeline)
+        location="SP",
+        price=price,
+        photo_path="",   # JUCESP não traz fotos
+        url=link,
+    )
 
-            # tenta capturar valor
-            price_match = re.search(r"R\$ ?[\d\.]+,\d{2}", title)
-            price = price_match.group() if price_match else "N/A"
 
-            auctions.append(
-                Auction(
-                    source="JUCESP",
-                    id=link.split("/")[-1],
-                    title=title,
-                    auction_date=date_iso,
-                    location="SP",
-                    price=price,
-                    photo_path="",   # JUCESP não traz fotos
-                    url=link,
-                )
-            )
-    return auctions
+async def fetch(photos_dir: Path) -> AsyncIterator[Auction]:
+    # leitura em streaming; só os itens publicados desde a última execução são lidos
+    async for lot in feeds.fetch_feed(__name__, PARSER_VERSION, RSS_URL, HEADERS, _to_lot):
+        yield lot
@@ -5,48 +5,36 @@ Preencha RSS_URL e a lógica de filtragem.
 """
 
 from __future__ import annotations
-import asyncio, re
-from datetime import datetime, timezone
+import re
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Dict
 
-import aiohttp
-from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
+from scraper import feeds
 from scraper.fetch_auctions import Auction
 
 UF = "{{UF}}"
 RSS_URL = "https://TODO/rss"      # TODO
+PARSER_VERSION = 2          # incremente ao mudar o parse: invalida o estado do feed
+PARSE_BUDGET = {"ms": 150, "kib": 8 * 1024}   # por 1.000 linhas, com folga sobre o medido nas fixtures
 HEADERS = {"User-Agent": "LeilaoBot/1.0"}
 
-@retry(wait=wait_exponential(multiplier=1, min=2, max=30), stop=stop_after_attempt(5))
-async def _get(session: aiohttp.ClientSession, url: str) -> str:
-    async with session.get(url, headers=HEADERS, timeout=60) as r:
-        r.raise_for_status()
-        return await r.text()
 
-async def fetch(photos_dir: Path) -> List[Auction]:
-    auctions = []
-    async with aiohttp.ClientSession() as s:
-        xml  = await _get(s, RSS_URL)
-        soup = BeautifulSoup(xml, "xml")
-        for item in soup.find_all("item"):
-            title = item.title.get_text(strip=True)
-            if "leil" not in title.lower():
-                continue
-            link  = item.link.get_text(strip=True)
-            pub   = item.pubDate.get_text(strip=True)
-            date  = datetime.strptime(pub, "%a, %d %b %Y %H:%M:%S %z")\
-                    .astimezone(timezone.utc).isoformat()
-            price = re.search(r"R\$ ?[\d\.]+,\d{2}", title)
-            auctions.append(Auction(
-                source=f"Junta {UF}",
-                id=link.split("/")[-1],
-                title=title,
-                auction_date=date,
-                location=UF,
-                price=price.group() if price else "N/A",
-                photo_path="",
-                url=link,
-            ))
-    return auctions
+def _to_lot(item: Dict[str, str]) -> Auction:
+    title = item["title"]
+    link = item["link"]
+    price = re.search(r"R\$ ?[\d\.]+,\d{2}", title)
+    return Auction(
+        source=f"Junta {UF}",
+        id=link.split("/")[-1],
+        title=title,
+        auction_date=item["date"],
+        location=UF,
+        price=price.group() if price else "N/A",
+        photo_path="",
+        url=link,
+    )
+
+
+async def fetch(photos_dir: Path) -> AsyncIterator[Auction]:
+    async for lot in feeds.fetch_feed(__name__, PARSER_VERSION, RSS_URL, HEADERS, _to_lot):
+        yield lot
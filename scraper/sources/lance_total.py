@@ -4,44 +4,41 @@ Coleta todos os imóveis com leilão aberto ou agendado.
 """
 from __future__ import annotations
 
-import asyncio
-from datetime import datetime, timezone
+import re
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, List
 
 import aiohttp
 from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
 
-from scraper.fetch_auctions import Auction
+from scraper import net, photos, sitemap
+from scraper.fetch_auctions import Auction, LotCache, cached_lots, parse_each, store_lots
 
 BASE_URL = "https://www.lancetotal.com.br"
 LIST_URL = f"{BASE_URL}/leiloes/imoveis"
 
+USE_SITEMAP = False         # descobre lotes pelo sitemap (catálogo inteiro) em vez da listagem
+SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
+LOT_PATTERN = re.compile(r"/lote/")     # páginas de lote no sitemap
+DETAIL_TTL = 86400          # lote sem lastmod no sitemap é relido após um dia
+DETAIL_CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+PARSER_VERSION = 3          # incremente ao mudar o parse: invalida o cache de parse
+PARSE_BUDGET = {"ms": 1000, "kib": 16 * 1024}   # por 1.000 linhas, com folga sobre o medido nas fixtures
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; LeilaoBot/1.0; +https://seusite.com)"
 }
 
 
-@retry(wait=wait_exponential(multiplier=1, min=2, max=30), stop=stop_after_attempt(5))
 async def _get(session: aiohttp.ClientSession, url: str) -> str:
-    async with session.get(url, headers=HEADERS, timeout=60) as resp:
-        resp.raise_for_status()
-        return await resp.text()
+    return await net.get_text(session, url, HEADERS)
 
 
-async def _download_photo(session: aiohttp.ClientSession, url: str, photos_dir: Path) -> str:
-    name = url.split("/")[-1].split("?")[0]
-    dest = photos_dir / name
-    if dest.exists():
-        return str(dest.relative_to(photos_dir.parent))
-    async with session.get(url, headers=HEADERS, timeout=60) as resp:
-        resp.raise_for_status()
-        dest.write_bytes(await resp.read())
-    return str(dest.relative_to(photos_dir.parent))
+_lot_cache: LotCache | None = None
 
 
-async def _parse_card(session: aiohttp.ClientSession, card, photos_dir: Path) -> Auction | None:
+def _parse_card(card, photos_dir: Path) -> Auction | None:
     link = card.select_one("a")
     if not link:
         return None
@@ -55,19 +52,18 @@ async def _parse_card(session: aiohttp.ClientSession, card, photos_dir: Path) ->
     price_text = price.get_text(strip=True) if price else "N/A"
     img_tag = card.select_one("img")
 
-    date_iso = datetime.strptime(date_text, "%d/%m/%Y").replace(tzinfo=timezone.utc).isoformat()
     photo_path = ""
     if img_tag and (img_tag.get("src") or img_tag.get("data-src")):
         img_url = img_tag.get("data-src") or img_tag["src"]
         if img_url.startswith("/"):
             img_url = BASE_URL + img_url
-        photo_path = await _download_photo(session, img_url, photos_dir)
+        photo_path = photos.defer(img_url, photos_dir)   # baixada depois
 
     return Auction(
         source="Lance Total",
         id=id_,
         title=title,
-        auction_date=date_iso,
+        auction_date=date_text,
         location="",
         price=price_text,
         photo_path=photo_path,
@@ -75,16 +71,59 @@ async def _parse_card(session: aiohttp.ClientSession, card, photos_dir: Path) ->
     )
 
 
-async def fetch(photos_dir: Path) -> List[Auction]:
-    auctions: List[Auction] = []
-    async with aiohttp.ClientSession() as session:
+async def _parse_detail(session: aiohttp.ClientSession, lot_url: str, photos_dir: Path) -> Auction | None:
+    """Página de um lote (modo sitemap)."""
+    html = await _get(session, lot_url)
+    cached = cached_lots(__name__, PARSER_VERSION, html)
+    if cached:
+        return cached[0]
+    soup = BeautifulSoup(html, "lxml")
+
+    title = soup.select_one("h1")
+    date_tag = soup.select_one(".leilao-data")   # rótulo do card; não outras datas da página (edital, publicação)
+    date_match = re.search(r"\d{2}/\d{2}/\d{4}", date_tag.get_text(" ")) if date_tag else None
+    if not (title and date_match):
+        return None
+    price = soup.select_one(".valor-lance, .valor-avaliacao")
+    image = soup.select_one("meta[property='og:image']")
+
+    lot = Auction(
+        source="Lance Total",
+        id=lot_url.rstrip("/").rsplit("/", 1)[-1],
+        title=title.get_text(strip=True),
+        auction_date=date_match.group(),     # normalizado no pipeline
+        location="",
+        price=price.get_text(strip=True) if price else "N/A",
+        photo_path=photos.defer(image["content"], photos_dir) if image and image.get("content") else "",
+        url=lot_url,
+    )
+    store_lots(__name__, PARSER_VERSION, html, [lot])
+    return lot
+
+
+async def fetch(photos_dir: Path) -> AsyncIterator[Auction]:
+    global _lot_cache
+    async with net.session() as session:
+        if USE_SITEMAP:
+            if _lot_cache is None:
+                _lot_cache = LotCache("lance_total", PARSER_VERSION, DETAIL_CACHE_MAX_BYTES)
+            async for lot in sitemap.crawl(session, SITEMAP_URL, HEADERS, LOT_PATTERN, _lot_cache,
+                                           lambda url: _parse_detail(session, url, photos_dir),
+                                           lambda lot: DETAIL_TTL):
+                yield lot
+            return
+
         html = await _get(session, LIST_URL)
+        cached = cached_lots(__name__, PARSER_VERSION, html)
+        if cached is not None:
+            yield cached
+            return
+
         soup = BeautifulSoup(html, "lxml")
         cards = soup.select(".card-imovel")
 
-        tasks = [_parse_card(session, c, photos_dir) for c in cards]
-        for coro in asyncio.as_completed(tasks):
-            lot = await coro
-            if lot:
-                auctions.append(lot)
-    return auctions
+        lots: List[Auction] = []
+        for lot in parse_each(_parse_card, cards, photos_dir):
+            lots.append(lot)
+            yield lot
+        store_lots(__name__, PARSER_VERSION, html, lots)
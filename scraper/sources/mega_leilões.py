@@ -5,33 +5,61 @@ Coleta somente lotes de imóveis com leilão futuro.
 from __future__ import annotations
 
 import asyncio
+import logging
 import re
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator
 
 import aiohttp
 from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential
 
-from scraper.fetch_auctions import Auction
+from scraper import net, normalize, photos, sitemap
+from scraper.fetch_auctions import Auction, LotCache, cached_lots, row_failed, store_lots
 
 BASE_URL = "https://www.megaleiloes.com.br"
+USE_SITEMAP = False         # descobre lotes pelo sitemap (catálogo inteiro) em vez da 1ª página da busca
+SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
+LOT_PATTERN = re.compile(r"/imoveis/")     # páginas de lote de imóvel no sitemap
+
+PARSER_VERSION = 2          # incremente ao mudar o parse: invalida o cache de parse
+PARSE_BUDGET = {"ms": 2500, "kib": 16 * 1024}   # por 1.000 linhas, com folga sobre o medido nas fixtures
+
+# Validade do lote em cache conforme a distância até o leilão (dias → segundos)
+DETAIL_TTLS = ((2, 2 * 3600), (7, 12 * 3600), (30, 3 * 86400))
+DETAIL_TTL_MAX = 7 * 86400
+DETAIL_CACHE_MAX_BYTES = 64 * 1024 ** 2
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; LeilaoBot/1.0; +https://seusite.com)"
 }
 
+logger = logging.getLogger(__name__)
+
+_lot_cache: LotCache | None = None
+
+
+def _detail_ttl(lot: Auction) -> float:
+    """Quanto mais perto o leilão, mais curta a validade (lance e situação mudam)."""
+    when = normalize.parse_date(lot.auction_date)
+    if when is None:
+        return DETAIL_TTLS[0][1]
+    days = (datetime.fromisoformat(when) - datetime.now(timezone.utc)).total_seconds() / 86400
+    for limit, ttl in DETAIL_TTLS:
+        if days <= limit:
+            return ttl
+    return DETAIL_TTL_MAX
+
 
-@retry(wait=wait_exponential(multiplier=1, min=2, max=30), stop=stop_after_attempt(5))
 async def _get(session: aiohttp.ClientSession, url: str) -> str:
-    async with session.get(url, headers=HEADERS, timeout=60) as resp:
-        resp.raise_for_status()
-        return await resp.text()
+    return await net.get_text(session, url, HEADERS)
 
 
 async def _parse_lot(session: aiohttp.ClientSession, lot_url: str, photos_dir: Path) -> Auction | None:
     html = await _get(session, lot_url)
+    cached = cached_lots(__name__, PARSER_VERSION, html)
+    if cached:
+        return cached[0]
     soup = BeautifulSoup(html, "lxml")
 
     title = soup.select_one("h1.product-title")
@@ -46,55 +74,64 @@ async def _parse_lot(session: aiohttp.ClientSession, lot_url: str, photos_dir: P
     date_match = re.search(r"\d{2}/\d{2}/\d{4}", date_box.text)
     if not date_match:
         return None
-    date_str = datetime.strptime(date_match.group(), "%d/%m/%Y").replace(tzinfo=timezone.utc).isoformat()
 
     price = price_box.get_text(strip=True) if price_box else "N/A"
     img_url = img_tag["src"] if img_tag else ""
 
-    photo_path = ""
-    if img_url:
-        photo_path = await _download_photo(session, img_url, photos_dir)
+    photo_path = photos.defer(img_url, photos_dir) if img_url else ""   # baixada depois
 
-    return Auction(
+    lot = Auction(
         source="Mega Leilões",
         id=lot_url.rsplit("/", 1)[-1],
         title=title.get_text(strip=True),
-        auction_date=date_str,
+        auction_date=date_match.group(),   # normalizado no pipeline
         location="",
         price=price,
         photo_path=photo_path,
         url=lot_url,
     )
+    store_lots(__name__, PARSER_VERSION, html, [lot])
+    return lot
 
 
-async def _download_photo(session: aiohttp.ClientSession, url: str, photos_dir: Path) -> str:
-    name = url.split("/")[-1].split("?")[0]
-    dest = photos_dir / name
-    if dest.exists():
-        return str(dest.relative_to(photos_dir.parent))
-    async with session.get(url, headers=HEADERS, timeout=60) as resp:
-        resp.raise_for_status()
-        content = await resp.read()
-    dest.write_bytes(content)
-    return str(dest.relative_to(photos_dir.parent))
-
-
-async def fetch(photos_dir: Path) -> List[Auction]:
+async def fetch(photos_dir: Path) -> AsyncIterator[Auction]:
     """
-    Retorna uma lista de Auction com imóveis agendados.
+    Gera os Auction de imóveis agendados à medida que cada lote é lido.
+    Lotes ainda válidos no cache de detalhe saem sem requisição; pelo sitemap,
+    também os vencidos cujo lastmod não mudou.
     """
+    global _lot_cache
+    if _lot_cache is None:
+        _lot_cache = LotCache("mega_leiloes", PARSER_VERSION, DETAIL_CACHE_MAX_BYTES)
+
     list_url = f"{BASE_URL}/busca?TipoImovel=1"  # imóvel
-    auctions: List[Auction] = []
+    async with net.session() as session:
+        if USE_SITEMAP:
+            async for lot in sitemap.crawl(session, SITEMAP_URL, HEADERS, LOT_PATTERN, _lot_cache,
+                                           lambda url: _parse_lot(session, url, photos_dir), _detail_ttl):
+                yield lot
+            return
 
-    async with aiohttp.ClientSession() as session:
         html = await _get(session, list_url)
         soup = BeautifulSoup(html, "lxml")
         lot_links = {BASE_URL + tag["href"] for tag in soup.select("a.productLink")}
 
-        tasks = [_parse_lot(session, url, photos_dir) for url in lot_links]
+        pending = []
+        for url in sorted(lot_links):
+            lot = _lot_cache.get(url)
+            if lot is None:
+                pending.append(url)
+            else:
+                yield lot
+        logger.info("Mega Leilões: %d lotes do cache, %d a buscar", len(lot_links) - len(pending), len(pending))
+
+        tasks = [_parse_lot(session, url, photos_dir) for url in pending]
         for coro in asyncio.as_completed(tasks):
-            lot = await coro
+            try:
+                lot = await coro
+            except Exception as exc:       # um lote com erro não derruba os demais
+                row_failed(exc)
+                continue
             if lot:
-                auctions.append(lot)
-
-    return auctions
+                _lot_cache.put(lot, _detail_ttl(lot))
+                yield lot
@@ -1,20 +1,37 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
 from pathlib import Path
 import json, logging, time, random, requests
+from requests.adapters import HTTPAdapter
 
-from .settings import HEADERS, RETRY, TIMEOUT, RAW_DIR
+from .raw_archive import get_archive
+from .settings import HEADERS, POOL_SIZE, RETRY, TIMEOUT
 
 log = logging.getLogger(__name__)
 
 
+class TimeoutSession(requests.Session):
+    """Session que aplica o TIMEOUT de settings quando a chamada não informa um."""
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUT)
+        return super().request(*args, **kwargs)
+
+
+def make_session() -> requests.Session:
+    session = TimeoutSession()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 class BaseScraper(ABC):
     """Classe base para todos os scrapers."""
 
     def __init__(self, name: str):
         self.name = name
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        self.session = make_session()
 
     @abstractmethod
     def fetch(self, **kwargs):
@@ -27,13 +44,9 @@ class BaseScraper(ABC):
         raise NotImplementedError
 
     def save_raw(self, content: str | bytes, suffix: str = "html") -> Path:
-        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        path = RAW_DIR / f"{self.name}_{ts}.{suffix}"
-        path.parent.mkdir(parents=True, exist_ok=True)
-        mode = "wb" if isinstance(content, (bytes, bytearray)) else "w"
-        with open(path, mode) as fp:
-            fp.write(content)
-        log.info("Raw salvo em %s", path)
+        """Arquiva o snapshot (comprimido e deduplicado) sem bloquear; devolve o caminho do blob."""
+        path = get_archive().put(self.name, content, suffix)
+        log.info("Raw arquivado em %s", path)
         return path
 
     # fluxo padrão
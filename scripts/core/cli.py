@@ -1,16 +1,151 @@
-import argparse, importlib
+import argparse
+import fnmatch
+import importlib
+import sys
+import time
+from collections import deque
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
 from pathlib import Path
 import json
 
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+GLOB_CHARS = "*?["
+
+
+def run_target(target):
+    mod = importlib.import_module(f"scripts.{target}")
+    scraper_cls = getattr(mod, "Scraper")
+    return scraper_cls().run()
+
+
+def _module_name(path):
+    """scripts/core/br/tj/x.py → core.br.tj.x; __init__.py vira o nome do pacote."""
+    parts = path.relative_to(SCRIPTS_DIR).with_suffix("").parts
+    return ".".join(parts[:-1] if parts[-1] == "__init__" else parts)
+
+
+def scraper_targets():
+    """
+    Alvos rodáveis: módulos de scripts/core com uma classe `Scraper` subclasse de
+    BaseScraper (a mesma regra de scraper/core_scrapers.discover).
+    """
+    from scripts.core.base_scraper import BaseScraper
+
+    targets = []
+    for path in sorted((SCRIPTS_DIR / "core").rglob("*.py")):
+        name = _module_name(path)
+        try:
+            mod = importlib.import_module(f"scripts.{name}")
+        except Exception as exc:
+            print(f"Ignorando {name}: {exc!r}", file=sys.stderr)
+            continue
+        cls = getattr(mod, "Scraper", None)
+        if isinstance(cls, type) and issubclass(cls, BaseScraper) and name not in targets:
+            targets.append(name)
+    return targets
+
+
+def expand_targets(patterns):
+    """Expande padrões glob (ex: core.br.tj.*) sobre os scrapers; padrão sem alvo encerra com erro."""
+    available = scraper_targets()
+    targets = []
+    for pattern in patterns:
+        if any(c in pattern for c in GLOB_CHARS):
+            matches = fnmatch.filter(available, pattern)
+            if not matches:
+                sys.exit(f"Nenhum scraper para o padrão {pattern} (disponíveis: {', '.join(available) or 'nenhum'})")
+            targets.extend(t for t in matches if t not in targets)
+        elif pattern not in targets:
+            targets.append(pattern)
+    return targets
+
+
+def _worker(target, conn):
+    try:
+        conn.send(("ok", run_target(target)))
+    except Exception as exc:
+        conn.send(("erro", repr(exc)))
+    finally:
+        conn.close()
+
+
+def _start(target):
+    recv_conn, send_conn = Pipe(duplex=False)
+    proc = Process(target=_worker, args=(target, send_conn), daemon=True)
+    proc.start()
+    send_conn.close()
+    return recv_conn, (proc, target, time.monotonic())
+
+
+def _finish(conn, proc, target, start, out):
+    """Lê o resultado de um alvo que terminou, grava os registros e devolve a linha do resumo."""
+    try:
+        status, payload = conn.recv()
+    except EOFError:
+        status, payload = "erro", f"processo terminou com código {proc.exitcode}"
+    proc.join()
+    if status != "ok":
+        return target, status, 0, time.monotonic() - start, payload
+    records = payload if isinstance(payload, list) else [payload]
+    for record in records:
+        line = {"target": target, **record} if isinstance(record, dict) else {"target": target, "value": record}
+        out.write(json.dumps(line, ensure_ascii=False) + "\n")
+    out.flush()
+    return target, status, len(records), time.monotonic() - start, ""
+
+
+def run_batch(targets, out, jobs, timeout):
+    """Roda os alvos em processos paralelos e grava NDJSON à medida que cada um termina."""
+    pending = deque(targets)
+    running = {}               # conn -> (processo, alvo, início)
+    summary = []
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            conn, entry = _start(pending.popleft())
+            running[conn] = entry
+
+        now = time.monotonic()
+        next_deadline = min(start + timeout for _, _, start in running.values())
+        for conn in wait(list(running), timeout=max(next_deadline - now, 0)):
+            summary.append(_finish(conn, *running.pop(conn), out))
+
+        now = time.monotonic()
+        for conn, (proc, target, start) in list(running.items()):
+            if now - start >= timeout:
+                proc.terminate()
+                proc.join()
+                del running[conn]
+                summary.append((target, "timeout", 0, now - start, f"excedeu {timeout}s"))
+
+    print(f"\n{'alvo':<50} {'status':<8} {'registros':>9} {'tempo':>8}", file=sys.stderr)
+    for target, status, count, elapsed, detail in summary:
+        print(f"{target:<50} {status:<8} {count:>9} {elapsed:>7.1f}s {detail}", file=sys.stderr)
+    return all(status == "ok" for _, status, *_ in summary)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Runner unificado")
-    parser.add_argument("target", help="caminho do módulo ex: br.juntas_comerciais.junta_sp")
+    parser.add_argument("targets", nargs="+",
+                        help="módulo(s) ex: br.juntas_comerciais.junta_sp; aceita glob (core.br.*) para rodar em lote")
     parser.add_argument("--out", default="stdout", help="arquivo de saída ou stdout")
+    parser.add_argument("--jobs", type=int, default=4, help="processos paralelos no modo em lote")
+    parser.add_argument("--timeout", type=float, default=300, help="segundos por alvo no modo em lote")
     args = parser.parse_args()
 
-    mod = importlib.import_module(f"scripts.{args.target}")
-    scraper_cls = getattr(mod, "Scraper")
-    result = scraper_cls().run()
+    batch = len(args.targets) > 1 or any(c in t for t in args.targets for c in GLOB_CHARS)
+    if batch:
+        targets = expand_targets(args.targets)
+        if args.out == "stdout":
+            ok = run_batch(targets, sys.stdout, args.jobs, args.timeout)
+        else:
+            with open(args.out, "w", encoding="utf-8") as fp:
+                ok = run_batch(targets, fp, args.jobs, args.timeout)
+            print(f"Dados salvos em {args.out}", file=sys.stderr)
+        sys.exit(0 if ok else 1)
+
+    result = run_target(args.targets[0])
 
     if args.out == "stdout":
         print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -18,6 +153,6 @@ def main():
         Path(args.out).write_text(json.dumps(result, ensure_ascii=False))
         print(f"Dados salvos em {args.out}")
 
+
 if __name__ == "__main__":
     main()
-
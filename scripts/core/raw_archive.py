@@ -0,0 +1,200 @@
+"""
+Arquivo de snapshots crus dos scrapers.
+Conteúdo deduplicado por SHA‑256, comprimido com zstd (dicionário treinado por
+scraper quando há amostras suficientes; gzip se `zstandard` não estiver instalado),
+índice SQLite (scraper, timestamp) → blob e política de retenção.
+As gravações acontecem numa thread própria para não segurar o scraper.
+"""
+from __future__ import annotations
+
+import atexit
+import gzip
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .settings import (RAW_DICT_SAMPLES, RAW_DICT_SIZE, RAW_DIR, RAW_KEEP_LAST,
+                       RAW_RETENTION_DAYS, RAW_ZSTD_LEVEL)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+log = logging.getLogger(__name__)
+
+_TRAIN_CHUNK = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY, codec TEXT, dict_id INTEGER, size INTEGER, stored_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    scraper TEXT, ts TEXT, suffix TEXT, hash TEXT REFERENCES blobs(hash)
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_scraper ON snapshots (scraper, ts);
+CREATE TABLE IF NOT EXISTS dicts (scraper TEXT PRIMARY KEY, dict_id INTEGER, path TEXT);
+"""
+
+
+class RawArchive:
+    def __init__(self, root: Path = RAW_DIR):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(root / "index.sqlite", check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._dicts: dict = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="raw-archive", daemon=True)
+        self._thread.start()
+
+    # ---------- API ----------
+    def put(self, scraper: str, content: str | bytes, suffix: str = "html") -> Path:
+        """Enfileira o snapshot e devolve o caminho do blob (gravado em segundo plano)."""
+        data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+        digest = hashlib.sha256(data).hexdigest()
+        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        self._queue.put((scraper, ts, suffix, digest, data))
+        return self._blob_path(digest)
+
+    def load(self, scraper: str, ts: str | None = None) -> bytes:
+        """Conteúdo do snapshot `ts` (ou do mais recente) de um scraper."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT s.hash, b.codec, b.dict_id FROM snapshots s JOIN blobs b USING (hash) "
+                "WHERE s.scraper = ? AND (? IS NULL OR s.ts = ?) ORDER BY s.ts DESC LIMIT 1",
+                (scraper, ts, ts),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"{scraper}@{ts or 'último'}")
+        digest, codec, dict_id = row
+        return self._decompress(self._blob_path(digest).read_bytes(), codec, scraper, dict_id)
+
+    def flush(self) -> None:
+        self._queue.join()
+
+    def apply_retention(self) -> int:
+        """Remove snapshots antigos (mantendo os RAW_KEEP_LAST mais recentes) e blobs órfãos."""
+        cutoff = (datetime.utcnow() - timedelta(days=RAW_RETENTION_DAYS)).strftime("%Y%m%d_%H%M%S")
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM snapshots WHERE ts < ? AND rowid NOT IN ("
+                "  SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                "    PARTITION BY scraper ORDER BY ts DESC) AS n FROM snapshots) WHERE n <= ?)",
+                (cutoff, RAW_KEEP_LAST),
+            ).rowcount
+            orphans = [h for (h,) in self._db.execute(
+                "SELECT hash FROM blobs WHERE hash NOT IN (SELECT hash FROM snapshots)")]
+            self._db.executemany("DELETE FROM blobs WHERE hash = ?", [(h,) for h in orphans])
+            self._db.commit()
+        for digest in orphans:
+            self._blob_path(digest).unlink(missing_ok=True)
+        if removed:
+            log.info("Retenção: %d snapshots e %d blobs removidos", removed, len(orphans))
+        return removed
+
+    # ---------- Internos ----------
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                self._store(*item)
+            except Exception as exc:
+                log.warning("Falha ao arquivar snapshot de %s: %s", item[0], exc)
+            finally:
+                self._queue.task_done()
+
+    def _store(self, scraper: str, ts: str, suffix: str, digest: str, data: bytes) -> None:
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if not known:
+            codec, dict_id, payload = self._compress(scraper, data)
+            path = self._blob_path(digest)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(payload)
+            with self._lock:
+                self._db.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?)",
+                                 (digest, codec, dict_id, len(data), len(payload)))
+        with self._lock:
+            self._db.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?)", (scraper, ts, suffix, digest))
+            self._db.commit()
+
+    def _dictionary(self, scraper: str, dict_id: int | None = None):
+        """
+        Dicionário zstd do scraper; treina um quando já há amostras suficientes.
+        Cada scraper tem no máximo um dicionário, então `dict_id` só serve para conferência.
+        """
+        if scraper in self._dicts:
+            return self._dicts[scraper]
+        with self._lock:
+            row = self._db.execute("SELECT dict_id, path FROM dicts WHERE scraper = ?", (scraper,)).fetchone()
+        if row is not None:
+            self._dicts[scraper] = zstandard.ZstdCompressionDict((self.root / row[1]).read_bytes())
+            return self._dicts[scraper]
+        if dict_id is not None:
+            raise RuntimeError(f"dicionário {dict_id} de {scraper} não encontrado")
+
+        with self._lock:
+            samples = self._db.execute(
+                "SELECT DISTINCT s.hash, b.codec FROM snapshots s JOIN blobs b USING (hash) "
+                "WHERE s.scraper = ? ORDER BY s.ts DESC LIMIT ?", (scraper, RAW_DICT_SAMPLES),
+            ).fetchall()
+        if len(samples) < RAW_DICT_SAMPLES:
+            return None
+        # o treinador do zstd precisa de muitas amostras pequenas: fatia cada página
+        contents = [self._decompress(self._blob_path(h).read_bytes(), codec, scraper, None)
+                    for h, codec in samples]
+        chunks = [c[i:i + _TRAIN_CHUNK] for c in contents for i in range(0, len(c), _TRAIN_CHUNK)]
+        try:
+            zdict = zstandard.train_dictionary(RAW_DICT_SIZE, chunks)
+        except zstandard.ZstdError as exc:
+            log.warning("Não foi possível treinar dicionário de %s: %s", scraper, exc)
+            self._dicts[scraper] = None      # não tenta de novo neste processo
+            return None
+        name = f"dicts/{scraper}.{zdict.dict_id()}.dict"
+        (self.root / "dicts").mkdir(parents=True, exist_ok=True)
+        (self.root / name).write_bytes(zdict.as_bytes())
+        with self._lock:
+            self._db.execute("INSERT INTO dicts VALUES (?, ?, ?)", (scraper, zdict.dict_id(), name))
+            self._db.commit()
+        self._dicts[scraper] = zdict
+        log.info("Dicionário zstd treinado para %s (%d amostras)", scraper, len(contents))
+        return zdict
+
+    def _compress(self, scraper: str, data: bytes) -> tuple[str, int | None, bytes]:
+        if zstandard is None:
+            return "gzip", None, gzip.compress(data, compresslevel=9)
+        zdict = self._dictionary(scraper)
+        cctx = zstandard.ZstdCompressor(level=RAW_ZSTD_LEVEL, dict_data=zdict)
+        return "zstd", zdict.dict_id() if zdict else None, cctx.compress(data)
+
+    def _decompress(self, payload: bytes, codec: str, scraper: str, dict_id: int | None) -> bytes:
+        if codec == "gzip":
+            return gzip.decompress(payload)
+        if zstandard is None:
+            raise RuntimeError("snapshot em zstd e o pacote zstandard não está instalado")
+        zdict = self._dictionary(scraper, dict_id) if dict_id else None
+        return zstandard.ZstdDecompressor(dict_data=zdict).decompress(payload)
+
+
+_archive: RawArchive | None = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> RawArchive:
+    """Arquivo compartilhado do processo; aplica a retenção ao abrir e esvazia a fila ao sair."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = RawArchive()
+            _archive.apply_retention()
+            atexit.register(_archive.flush)
+    return _archive
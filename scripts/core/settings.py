@@ -3,5 +3,13 @@ from pathlib import Path
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; Scraper/1.0)"}
 RETRY = 3
 TIMEOUT = 15
+POOL_SIZE = 10   # conexões mantidas por host em cada Session
 RAW_DIR = Path(__file__).resolve().parents[1] / "data" / "raw"
 
+
+# arquivo de snapshots crus (raw_archive.py)
+RAW_RETENTION_DAYS = 30    # snapshots mais antigos são removidos...
+RAW_KEEP_LAST = 5          # ...exceto os N mais recentes de cada scraper
+RAW_ZSTD_LEVEL = 19
+RAW_DICT_SAMPLES = 20      # snapshots distintos necessários para treinar o dicionário
+RAW_DICT_SIZE = 112_640    # bytes
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# python -m scripts.gerar_municipios  (regera scraper/municipios.csv com todos os municípios do IBGE)
+#
+# Nomes e códigos IBGE vêm do pacote brutils (brutils/data/cities_code.json);
+# coordenadas, do GeoNames empacotado no geonamescache (cities500.json).
+# Só é preciso na hora de regerar:  pip install brutils geonamescache
+import csv
+import json
+from importlib import resources
+
+from scraper.geo import GAZETTEER_FILE, IBGE_UF, _max_edits, _Trie, normalize
+
+# admin1code do GeoNames → UF (o GeoNames não usa os códigos do IBGE)
+GEONAMES_UF = {
+    "01": "AC", "02": "AL", "03": "AP", "04": "AM", "05": "BA", "06": "CE", "07": "DF",
+    "08": "ES", "29": "GO", "13": "MA", "14": "MT", "11": "MS", "15": "MG", "16": "PA",
+    "17": "PB", "18": "PR", "30": "PE", "20": "PI", "21": "RJ", "22": "RN", "23": "RS",
+    "24": "RO", "25": "RR", "26": "SC", "27": "SP", "28": "SE", "31": "TO",
+}
+UF_IBGE = {uf: code for code, uf in IBGE_UF.items()}
+
+
+def _lugares():
+    """(uf, nome normalizado) → lugares do GeoNames, pelo nome oficial e pelos alternativos;
+    mais uma trie por UF para grafias que diferem por poucas letras ("dOeste", "dos Carajás")."""
+    dados = json.loads(resources.files("geonamescache").joinpath("data/cities500.json").read_text("utf-8"))
+    oficial, alternativo, tries = {}, {}, {}
+    for lugar in dados.values():
+        uf = GEONAMES_UF.get(lugar["admin1code"]) if lugar["countrycode"] == "BR" else None
+        if not uf:
+            continue
+        oficial.setdefault((uf, normalize(lugar["name"])), []).append(lugar)
+        tries.setdefault(uf, _Trie()).insert(normalize(lugar["name"]), lugar["geonameid"])
+        for alt in lugar.get("alternatenames") or ():
+            alternativo.setdefault((uf, normalize(alt)), []).append(lugar)
+    return oficial, alternativo, tries
+
+
+def _aproximado(oficial, tries, uf: str, chave: str):
+    """Lugares do único nome da UF a poucas edições de `chave`; None se ambíguo ou longe."""
+    _, ids = tries[uf].search(chave, _max_edits(chave))
+    ids = set(ids)
+    achados = [lugar for (u, _), lugares in oficial.items() if u == uf
+               for lugar in lugares if lugar["geonameid"] in ids]
+    return achados if len({normalize(lugar["name"]) for lugar in achados}) == 1 else None
+
+
+def _nome(lugar: dict, chave: str) -> str:
+    """Grafia (com acentos) do GeoNames que corresponde ao nome do IBGE."""
+    for nome in (lugar["name"], *(lugar.get("alternatenames") or ())):
+        if normalize(nome) == chave:
+            return nome
+    return lugar["name"]
+
+
+def main():
+    ibge = json.loads(resources.files("brutils").joinpath("data/cities_code.json").read_text("utf-8"))
+    oficial, alternativo, tries = _lugares()
+
+    linhas, faltando = [], []
+    for uf, cidades in ibge.items():
+        for cidade, codigo in cidades.items():
+            chave = normalize(cidade)
+            achados = (oficial.get((uf, chave)) or alternativo.get((uf, chave))
+                       or _aproximado(oficial, tries, uf, chave))
+            if not achados:
+                faltando.append(f"{cidade}/{uf}")
+                continue
+            sede = max(achados, key=lambda lugar: lugar.get("population") or 0)
+            linhas.append((codigo, _nome(sede, chave), sede["latitude"], sede["longitude"], UF_IBGE[uf]))
+
+    linhas.sort()
+    with GAZETTEER_FILE.open("w", encoding="utf-8", newline="") as fp:
+        out = csv.writer(fp)
+        out.writerow(("codigo_ibge", "nome", "latitude", "longitude", "codigo_uf"))
+        out.writerows(linhas)
+
+    total = len(linhas) + len(faltando)
+    print(f"Pronto! {len(linhas)}/{total} municípios em {GAZETTEER_FILE.name}.")
+    if faltando:
+        print(f"Sem coordenadas no GeoNames ({len(faltando)}): {', '.join(sorted(faltando)[:20])} …")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# python scripts/gerar_plugins.py  (gera os plug‑ins por UF a partir dos modelos *_template.py)
+from pathlib import Path
+
+estados = [
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT",
+    "PA", "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "TO",
+]
+
+
+def criar(uf: str, modelo: Path):
+    txt = modelo.read_text().replace("{{UF}}", uf)
+    destino = modelo.with_name(f"{modelo.stem.split('_')[0]}_{uf.lower()}.py")
+    destino.write_text(txt)
+
+
+root = Path(__file__).resolve().parents[1] / "scraper" / "sources"
+tribunal_tpl = root / "tribunal_template.py"
+junta_tpl = root / "junta_template.py"
+
+modelos = [tpl for tpl in (tribunal_tpl, junta_tpl) if tpl.exists()]
+for uf in estados:
+    for tpl in modelos:
+        criar(uf, tpl)
+
+print(f"Pronto! {len(estados) * len(modelos)} arquivos gerados.")
@@ -0,0 +1,30 @@
+import os
+
+from scraper.cache import DiskCache
+
+
+def test_ttl(tmp_path):
+    cache = DiskCache(tmp_path, 1 << 20)
+    cache.set("fresco", {"a": 1}, ttl=60)
+    cache.set("vencido", {"a": 2}, ttl=-1)
+    cache.set("eterno", [1, 2])
+    assert cache.get("fresco") == {"a": 1}
+    assert cache.get("vencido") is None
+    assert cache.get("vencido", allow_expired=True) == {"a": 2}
+    assert cache.get("eterno") == [1, 2]
+    assert cache.get("ausente") is None
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_lru_eviction(tmp_path):
+    cache = DiskCache(tmp_path, 1 << 20)
+    for i in range(10):
+        cache.set(f"k{i}", "x" * 100)
+    for i in range(10):                               # k0 é o mais antigo; k9, o mais recente
+        os.utime(cache._path(f"k{i}"), (1000 + i, 1000 + i))
+    cache.get("k0")                                   # leitura renova k0
+    cache.max_bytes = 5 * (cache._path("k0").stat().st_size) + 10
+    cache.set("novo", "x" * 100)
+    assert cache.get("k0") is not None
+    assert cache.get("novo") is not None
+    assert cache.get("k1") is None
@@ -0,0 +1,29 @@
+import pytest
+
+from scraper import codec
+
+SAMPLE = {"título": "Casa “térrea”\tcom \\ barra", "preço": 123456, "lat": -22.90556, "pequeno": 1e-07,
+          "grande": 1e16, "meio": 1.5e-05, "texto": "1e-7 0.000015", "vazio": None, "lista": [True, 0.5, []]}
+
+
+@pytest.mark.parametrize("name", codec.available())
+@pytest.mark.parametrize("indent", [False, True])
+def test_backends_write_same_text_as_json(name, indent):
+    assert codec.get(name).dumps(SAMPLE, indent) == codec.get("json").dumps(SAMPLE, indent)
+
+
+@pytest.mark.parametrize("name", codec.available())
+def test_roundtrip(name):
+    backend = codec.get(name)
+    assert backend.loads(backend.dumps(SAMPLE, False)) == SAMPLE
+
+
+@pytest.mark.parametrize("name", codec.available())
+def test_invalid_input_raises_value_error(name):
+    with pytest.raises(ValueError):
+        codec.get(name).loads("{não é json")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        codec.get("simdjson")
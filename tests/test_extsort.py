@@ -0,0 +1,26 @@
+import random
+
+from scraper.extsort import ExternalSorter
+
+
+def _sorted(buffer_lines, rows):
+    sorter = ExternalSorter(buffer_lines)
+    for key, line in rows:
+        sorter.add(key, line)
+    return list(sorter)
+
+
+def test_spilled_runs_match_in_memory_sort():
+    rng = random.Random(7)
+    rows = [((rng.choice("ABC"), str(rng.randrange(100))), f"linha {i}\tcom tab") for i in range(1000)]
+    assert _sorted(10, rows) == _sorted(10_000, rows) == sorted(rows)
+
+
+def test_runs_are_removed():
+    sorter = ExternalSorter(2)
+    for i in range(5):
+        sorter.add((i,), str(i))
+    run_dir = sorter._dir
+    assert run_dir.exists()
+    assert [line for _, line in sorter] == ["0", "1", "2", "3", "4"]
+    assert not run_dir.exists()
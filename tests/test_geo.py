@@ -0,0 +1,33 @@
+from scraper import geo
+
+
+def test_locate_city_with_uf():
+    lat, lon, gh = geo.locate("Campinas/SP")
+    assert (round(lat, 2), round(lon, 2)) == (-22.91, -47.06)
+    assert len(gh) == geo.CITY_PRECISION
+    assert geo.locate("Comarca de Campinas - SP") == (lat, lon, gh)
+
+
+def test_locate_tolerates_typos():
+    assert geo.locate("Campinass", "SP") == geo.locate("Campinas/SP")
+
+
+def test_locate_ambiguous_name_needs_uf():
+    assert geo.locate("Bom Jesus") is None
+    assert geo.locate("Bom Jesus/PI") is not None
+
+
+def test_locate_falls_back_to_uf_centroid():
+    lat, lon, gh = geo.locate("lugar inexistente", "RJ")
+    assert (lat, lon) == geo.UF_CENTROIDS["RJ"]
+    assert len(gh) == geo.UF_PRECISION
+
+
+def test_locate_unknown():
+    assert geo.locate("lugar inexistente") is None
+
+
+def test_uf_from_source():
+    assert geo.uf_from_source("TJSP") == "SP"
+    assert geo.uf_from_source("TJDFT") == "DF"
+    assert geo.uf_from_source("Zukerman") == ""
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from scraper import bench_scale, feeds, fetch_auctions as fa
+from scraper.fetch_auctions import Auction
+
+
+def _lot(source, id, title="Casa"):
+    return Auction(source, id, title, "2030-01-01T00:00:00+00:00", "Campinas/SP", "R$ 1,00", "", f"https://x/{id}")
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for name in ("DATA_DIR", "PHOTOS_DIR", "SHARDS_DIR", "COSTS_FILE", "SCHEDULE_FILE", "HEALTH_FILE", "SOURCES_DIR",
+                 "SITE_DIR", "PROFILE_DIR", "CACHE_DIR", "PHOTO_QUEUE_FILE", "GEO_DIR", "HISTORY_FILE", "CORE_SCRAPERS"):
+        monkeypatch.setattr(fa, name, getattr(fa, name))      # restaurados ao fim do teste
+    monkeypatch.setattr(fa, "_parse_cache", None)
+    monkeypatch.setattr(feeds, "_state", None)
+    bench_scale._sandbox(fa, tmp_path)
+    fa.SHARDS_DIR.mkdir(parents=True)
+    return tmp_path
+
+
+def _write_shard(index, lots):
+    lines = sorted(json.dumps(lot.to_json(), ensure_ascii=False) for lot in lots)
+    (fa.SHARDS_DIR / f"shard-{index}-of-2.ndjson").write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+
+def test_merge_shards_dedups_and_orders(data_dir):
+    _write_shard(0, [_lot("B", "2"), _lot("A", "1"), _lot("A", "3")])
+    _write_shard(1, [_lot("A", "3"), _lot("A", "2"), _lot("C", "1")])
+
+    assert fa.merge_shards(fa.SHARDS_DIR) == 5
+    catalog = json.loads((data_dir / "auctions.json").read_text(encoding="utf-8"))
+    assert [(lot["source"], lot["id"]) for lot in catalog] == [("A", "1"), ("A", "2"), ("A", "3"), ("B", "2"), ("C", "1")]
+
+
+def test_merge_shards_without_shards(data_dir):
+    with pytest.raises(FileNotFoundError):
+        fa.merge_shards(fa.SHARDS_DIR)
@@ -0,0 +1,46 @@
+import pytest
+
+from scraper.normalize import parse_date, parse_price
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("05/03/2025", "2025-03-05T00:00:00+00:00"),
+    ("Leilão em 5/3/2025 às 10h", "2025-03-05T00:00:00+00:00"),
+    ("2025-03-05T10:00:00-03:00", "2025-03-05T13:00:00+00:00"),
+    ("2025-03-05", "2025-03-05T00:00:00+00:00"),
+    ("Wed, 05 Mar 2025 10:00:00 GMT", "2025-03-05T10:00:00+00:00"),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text", ["31/02/2025", "amanhã", ""])
+def test_parse_date_rejects(text):
+    assert parse_date(text) is None
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("R$ 1.234,56", 123456),
+    ("R$\xa0250.000", 25000000),
+    ("Lance mínimo: R$ 99,9 (2ª praça)", 9990),
+    ("1.234,56", 123456),
+    ("1234", 123400),
+    ("1,234.56", 123456),
+    ("1.234.567,8", 123456780),
+    ("1234.5", 123450),
+    ("R$ 500.", 50000),
+    ("R$ 1.000 (US$ 200)", 100000),
+])
+def test_parse_price(text, cents):
+    assert parse_price(text) == (True, cents)
+
+
+@pytest.mark.parametrize("text", ["", "Sob consulta", "N/A", "—"])
+def test_parse_price_absent(text):
+    assert parse_price(text) == (True, None)
+
+
+@pytest.mark.parametrize("text", ["abc", "R$ ???", "$1,234.56", "US$ 1,234.56", "€ 10", "10 USD",
+                                  "1,234", "R$ 1,234", "1.2345", "12.34.567"])
+def test_parse_price_unrecognized(text):
+    assert parse_price(text) == (False, None)
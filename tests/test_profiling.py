@@ -0,0 +1,34 @@
+import asyncio
+import concurrent.futures
+import time
+
+from scraper import profiling
+
+
+def _worker(seconds):
+    """Homônima do worker do pool, mas ocupada: tem de aparecer no perfil."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_idle_threads_are_skipped_but_namesakes_are_not(tmp_path, monkeypatch):
+    async def main():
+        with concurrent.futures.ThreadPoolExecutor(2) as pool:
+            await asyncio.sleep(0.1)                                    # pool e laço ociosos
+            await asyncio.get_running_loop().run_in_executor(pool, _worker, 0.2)
+
+    samplers = []
+
+    class Recording(profiling.Sampler):
+        def __init__(self, loop):
+            super().__init__(loop)
+            samplers.append(self)
+
+    monkeypatch.setattr(profiling, "Sampler", Recording)
+    asyncio.run(profiling.run(main(), tmp_path))
+
+    leaves = {stack.rsplit(";", 1)[-1] for counter in samplers[0].samples.values() for stack in counter}
+    pool_worker = concurrent.futures.thread._worker.__code__
+    assert f"{__name__}:_worker:{_worker.__code__.co_firstlineno}" in leaves
+    assert f"concurrent.futures.thread:_worker:{pool_worker.co_firstlineno}" not in leaves
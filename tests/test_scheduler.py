@@ -0,0 +1,40 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from scraper import scheduler
+
+
+def _entry(checks, unchanged, hours=24.0, requests=10.0, last_run="2030-01-01T00:00:00"):
+    return {"checks": checks, "unchanged": unchanged, "hours": hours * checks,
+            "requests": requests, "last_run": last_run}
+
+
+def test_intervals_fit_budget():
+    state = {"agitada": _entry(10, 0), "media": _entry(10, 5), "parada": _entry(10, 9)}
+    budget = 100
+    every = scheduler.intervals(state, budget)
+    spent = sum(state[n]["requests"] * 24 / h for n, h in every.items())
+    assert spent == pytest.approx(budget)
+    assert every["agitada"] < every["media"] < every["parada"]
+
+
+def test_intervals_clamped():
+    state = {"agitada": _entry(10, 0, requests=1), "parada": _entry(50, 50, requests=1)}
+    every = scheduler.intervals(state, budget=1_000_000)
+    assert every["agitada"] == scheduler.MIN_INTERVAL_H
+    every = scheduler.intervals(state, budget=1)
+    assert every["parada"] == scheduler.MAX_INTERVAL_H
+
+
+def test_change_rate_never_infinite():
+    assert math.isfinite(scheduler.change_rate(_entry(5, 0)))
+    assert scheduler.change_rate(_entry(5, 0)) > scheduler.change_rate(_entry(5, 4))
+
+
+def test_due_new_and_overdue():
+    now = datetime(2030, 1, 2)
+    state = {"recente": _entry(10, 9, last_run=(now - timedelta(minutes=5)).isoformat()),
+             "antiga": _entry(10, 9, last_run=(now - timedelta(days=30)).isoformat())}
+    assert scheduler.due(state, ["recente", "antiga", "nova"], now) == {"antiga", "nova"}
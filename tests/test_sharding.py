@@ -0,0 +1,32 @@
+import pytest
+
+from scraper import sharding
+
+
+def test_assign_lpt():
+    costs = {"a": 50, "b": 40, "c": 30, "d": 20, "e": 10}
+    shards = sharding.assign(costs, 2, costs)
+    assert shards == [["a", "d", "e"], ["b", "c"]]
+    assert sorted(sum(shards, [])) == sorted(costs)
+
+
+def test_assign_unknown_cost_uses_median():
+    costs = {"a": 10, "b": 20, "c": 30}
+    shards = sharding.assign(["a", "b", "c", "nova"], 2, costs)
+    assert shards == [["c", "a"], ["b", "nova"]]
+
+
+def test_assign_is_deterministic():
+    names = [f"fonte{i}" for i in range(20)]
+    assert sharding.assign(names, 3, {}) == sharding.assign(reversed(names), 3, {})
+
+
+@pytest.mark.parametrize("spec, expected", [("0/4", (0, 4)), ("3/4", (3, 4))])
+def test_parse_shard(spec, expected):
+    assert sharding.parse_shard(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["4/4", "-1/4", "x", "0/0"])
+def test_parse_shard_invalid(spec):
+    with pytest.raises(ValueError):
+        sharding.parse_shard(spec)